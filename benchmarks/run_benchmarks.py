@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the data pipeline scripts
+Times parse_size_cm, calculate_optimal_sizes, generate_size_recommendations,
+get_image_info, process_artwork_json and the search index (build, indexed query
+and the linear scan it replaces) on synthetic catalogs, each case in its own
+process so peak RSS is per case. Results go to JSON; --compare flags regressions.
+
+    python benchmarks/run_benchmarks.py --sizes 200,10000 --output bench.json
+    python benchmarks/run_benchmarks.py --compare base.json bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, 'data')
+sys.path.insert(0, DATA_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+CASES = [
+    'parse_size_cm',
+    'calculate_optimal_sizes',
+    'generate_size_recommendations',
+    'get_image_info',
+    'process_artwork_json',
+    'search_index_build',
+    'search_index_query',
+    'search_scan',
+]
+
+SEARCH_QUERIES = 1000
+
+
+def _load_catalog(workdir):
+    with open(os.path.join(workdir, 'artworks.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _search_queries(artworks, count=SEARCH_QUERIES):
+    """Two-character slices of Chinese titles and single English title words"""
+    import random
+
+    rng = random.Random(0)
+    queries = []
+    while len(queries) < count:
+        artwork = rng.choice(artworks)
+        title = artwork.get('title') or ''
+        words = (artwork.get('titleEn') or '').split()
+        if rng.random() < 0.5 and len(title) >= 2:
+            start = rng.randrange(len(title) - 1)
+            queries.append(title[start:start + 2])
+        elif words:
+            queries.append(rng.choice(words))
+    return queries
+
+
+def run_case(case, workdir):
+    """Run one benchmark in this process, returns (items, seconds)"""
+    from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+    from optimal_size_calculator_fixed import OptimalSizeCalculator
+    from size_parser import parse_size_cm
+
+    calculator = OptimalSizeCalculator()
+
+    if case == 'parse_size_cm':
+        sizes = [artwork.get('sizeCm') for artwork in _load_catalog(workdir)]
+        parse_size_cm.cache_clear()
+        start = time.perf_counter()
+        for size_str in sizes:
+            calculator.parse_size_cm(size_str)
+        return len(sizes), time.perf_counter() - start
+
+    if case == 'calculate_optimal_sizes':
+        artworks = _load_catalog(workdir)
+        start = time.perf_counter()
+        for artwork in artworks:
+            calculator.calculate_optimal_sizes(artwork)
+        return len(artworks), time.perf_counter() - start
+
+    if case == 'generate_size_recommendations':
+        start = time.perf_counter()
+        recommendations = calculator.generate_size_recommendations(os.path.join(workdir, 'artworks.json'))
+        return len(recommendations), time.perf_counter() - start
+
+    if case in ('search_index_build', 'search_index_query', 'search_scan'):
+        from search_index import SEARCH_FIELDS, SearchIndexBuilder
+
+        artworks = _load_catalog(workdir)
+        if case == 'search_index_build':
+            start = time.perf_counter()
+            SearchIndexBuilder().build(artworks)
+            return len(artworks), time.perf_counter() - start
+
+        queries = _search_queries(artworks)
+        if case == 'search_index_query':
+            index = SearchIndexBuilder().build(artworks)
+            start = time.perf_counter()
+            for query in queries:
+                index.search(query)
+            return len(queries), time.perf_counter() - start
+
+        # What the browser does today: a substring test on every record. The
+        # lowercased text is prepared up front and fewer queries run, since it is O(catalog)
+        texts = [(artwork['id'], '\x1f'.join(artwork.get(field) or '' for field in SEARCH_FIELDS).lower())
+                 for artwork in artworks]
+        queries = queries[:SEARCH_QUERIES // 10]
+        start = time.perf_counter()
+        for query in queries:
+            needle = query.lower()
+            [artwork_id for artwork_id, text in texts if needle in text]
+        return len(queries), time.perf_counter() - start
+
+    extractor = ImageMetadataExtractor(image_dir=os.path.join(workdir, 'images', 'paintings', 'large'))
+
+    if case == 'get_image_info':
+        image_dir = extractor.image_dir
+        paths = [os.path.join(image_dir, name) for name in sorted(os.listdir(image_dir))]
+        start = time.perf_counter()
+        for path in paths:
+            extractor.get_image_info(path, path)
+        return len(paths), time.perf_counter() - start
+
+    if case == 'process_artwork_json':
+        recommendations_file = os.path.join(workdir, 'recommendations.json')
+        if not os.path.exists(recommendations_file):
+            calculator.save_recommendations(
+                calculator.generate_size_recommendations(os.path.join(workdir, 'artworks.json')),
+                recommendations_file
+            )
+        start = time.perf_counter()
+        extractor.process_artwork_json(recommendations_file, output_file=os.path.join(workdir, 'updated.json'))
+        return len(os.listdir(extractor.image_dir)), time.perf_counter() - start
+
+    raise ValueError(f"Unknown case: {case}")
+
+
+def child_main(case, workdir):
+    """Entry point of the per-case subprocess: prints one JSON line"""
+    logging.disable(logging.CRITICAL)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        items, seconds = run_case(case, workdir)
+    print(json.dumps({
+        'items': items,
+        'wall_s': seconds,
+        'items_per_sec': items / seconds if seconds else None,
+        # ru_maxrss is KB on Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }))
+
+
+def prepare_workdir(root, size, max_images):
+    """Synthetic catalog and PNG fixtures for one catalog size"""
+    workdir = os.path.join(root, f"catalog_{size}")
+    os.makedirs(workdir, exist_ok=True)
+    catalog_file = os.path.join(workdir, 'artworks.json')
+    if not os.path.exists(catalog_file):
+        artworks = synthetic.generate_catalog(size, os.path.join(DATA_DIR, 'artworks.json'))
+        synthetic.write_catalog(artworks, catalog_file)
+        synthetic.write_image_fixtures(artworks, os.path.join(workdir, 'images', 'paintings', 'large'),
+                                       max_images)
+    return workdir
+
+
+def run_suite(sizes, cases, max_images, repeat, root):
+    results = {}
+    for size in sizes:
+        workdir = prepare_workdir(root, size, max_images)
+        for case in cases:
+            best = None
+            for _ in range(repeat):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', case, workdir],
+                    cwd=workdir, check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                if best is None or result['wall_s'] < best['wall_s']:
+                    best = result
+            key = f"{case}@{size}"
+            results[key] = best
+            rate = f"{best['items_per_sec']:12.0f}/s" if best['items_per_sec'] else ''
+            print(f"  {key:40s} {best['wall_s'] * 1000:10.1f} ms {rate}  {best['peak_rss_kb'] / 1024:7.1f} MB")
+    return results
+
+
+def compare(base_file, new_file, threshold):
+    """Print per-case changes, returns the list of regressed keys"""
+    with open(base_file, 'r', encoding='utf-8') as f:
+        base = json.load(f)['results']
+    with open(new_file, 'r', encoding='utf-8') as f:
+        new = json.load(f)['results']
+
+    regressions = []
+    print(f"{'case':40s} {'wall':>10s} {'rss':>10s}")
+    for key in sorted(set(base) & set(new)):
+        wall_change = new[key]['wall_s'] / base[key]['wall_s'] - 1 if base[key]['wall_s'] else 0.0
+        rss_change = new[key]['peak_rss_kb'] / base[key]['peak_rss_kb'] - 1 if base[key]['peak_rss_kb'] else 0.0
+        regressed = wall_change > threshold or rss_change > threshold
+        flag = '  ❌ REGRESSION' if regressed else ''
+        print(f"{key:40s} {wall_change:+9.1%} {rss_change:+9.1%}{flag}")
+        if regressed:
+            regressions.append(key)
+
+    for key in sorted(set(base) ^ set(new)):
+        print(f"{key:40s} only in {'base' if key in base else 'new'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline scripts")
+    parser.add_argument("--sizes", default="200,10000,100000",
+                        help="comma separated catalog sizes (default: 200,10000,100000)")
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--max-images", type=int, default=2000,
+                        help="PNG fixtures per catalog, the rest have no image (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=1, help="best of N runs per case")
+    parser.add_argument("--workdir", default=None,
+                        help="where to keep synthetic catalogs (default: a temp dir)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown or RSS growth flagged as a regression (default: 0.10)")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(*args.child)
+        return
+
+    if args.compare:
+        regressions = compare(*args.compare, threshold=args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\n✅ No regressions above {args.threshold:.0%}")
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = [case.strip() for case in args.cases.split(',')]
+
+    print(f"📊 Benchmarking {', '.join(cases)} on catalogs of {', '.join(map(str, sizes))}")
+    with contextlib.ExitStack() as stack:
+        root = args.workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix='mom-art-bench-'))
+        results = run_suite(sizes, cases, args.max_images, args.repeat, root)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'max_images': args.max_images,
+            },
+            'results': results
+        }, f, indent=2)
+    print(f"💾 Results saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
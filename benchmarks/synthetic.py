@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Synthetic catalogs and PNG fixtures for the data pipeline benchmarks
+Sizes, titles and descriptions are sampled from the real data/artworks.json so
+the mix of separators, missing values, keyword categories and text lengths
+matches production
+"""
+
+import json
+import os
+import random
+import struct
+import zlib
+
+SEPARATORS = ['x', '×', ' × ', ' x ', ' ×', 'X']
+
+
+def load_seed(artworks_file):
+    """Real sizeCm values, titles and descriptions to sample from"""
+    with open(artworks_file, 'r', encoding='utf-8') as f:
+        artworks = json.load(f)
+    sizes = [artwork.get('sizeCm') for artwork in artworks]
+    titles = [artwork.get('title', '') for artwork in artworks if artwork.get('title')]
+    titles_en = [artwork.get('titleEn', '') for artwork in artworks]
+    # Kept per record, so empty descriptions occur as often as in the catalog
+    descriptions = [(artwork.get('description') or '', artwork.get('descriptionEn') or '') for artwork in artworks]
+    return sizes, titles, titles_en, descriptions
+
+
+def synthetic_size(rng, seed_sizes):
+    """Mostly real values, the rest random dimensions in the real separator styles"""
+    if rng.random() < 0.7:
+        return rng.choice(seed_sizes)
+    height = rng.choice([rng.randint(20, 240), round(rng.uniform(20, 240), 1)])
+    width = rng.choice([rng.randint(20, 240), round(rng.uniform(20, 240), 1)])
+    return f"{height}{rng.choice(SEPARATORS)}{width}"
+
+
+def synthetic_title(rng, seed_titles):
+    """A real title, sometimes with a second title's characters mixed in"""
+    title = rng.choice(seed_titles)
+    if rng.random() < 0.3:
+        other = rng.choice(seed_titles)
+        title = title + '－' + ''.join(rng.sample(other, min(len(other), 4)))
+    return title
+
+
+def synthetic_description(rng, seed_descriptions):
+    """A real (description, descriptionEn) pair, sometimes followed by a second one"""
+    description, description_en = rng.choice(seed_descriptions)
+    if description and rng.random() < 0.3:
+        other, other_en = rng.choice(seed_descriptions)
+        description = description + other
+        description_en = ' '.join(text for text in (description_en, other_en) if text)
+    return description, description_en
+
+
+def generate_catalog(count, seed_file, rng_seed=0):
+    """Return a list of artworks shaped like data/artworks.json"""
+    rng = random.Random(rng_seed)
+    seed_sizes, seed_titles, seed_titles_en, seed_descriptions = load_seed(seed_file)
+
+    artworks = []
+    for i in range(count):
+        artwork_id = f"bench-{i:08d}"
+        description, description_en = synthetic_description(rng, seed_descriptions)
+        artworks.append({
+            'id': artwork_id,
+            'title': synthetic_title(rng, seed_titles),
+            'titleEn': rng.choice(seed_titles_en),
+            'image': f"./images/paintings/thumbnails/{artwork_id}_thumb.png",
+            'imageHigh': f"./images/paintings/large/{artwork_id}_large.png",
+            'description': description,
+            'descriptionEn': description_en,
+            'sizeCm': synthetic_size(rng, seed_sizes),
+        })
+    return artworks
+
+
+def write_catalog(artworks, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(artworks, f, ensure_ascii=False, indent=2)
+
+
+def _png_chunk(chunk_type, data):
+    chunk = chunk_type + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+
+def write_png(path, width, height):
+    """Valid RGB PNG of a flat color; cheap to create at any size"""
+    row = b'\x00' + b'\xf0\xe8\xd8' * width
+    compressor = zlib.compressobj(9)
+    idat = b''.join(compressor.compress(row) for _ in range(height)) + compressor.flush()
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(_png_chunk(b'IDAT', idat))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+def write_image_fixtures(artworks, image_dir, max_images, long_side=1600):
+    """Large PNGs for the first max_images artworks, sized to their aspect ratio"""
+    from size_parser import parse_size_cm
+
+    os.makedirs(image_dir, exist_ok=True)
+    paths = []
+    for artwork in artworks[:max_images]:
+        height_cm, width_cm = parse_size_cm(artwork.get('sizeCm'))
+        ratio = (width_cm / height_cm) if height_cm and width_cm else 1.0
+        if ratio >= 1:
+            width, height = long_side, max(1, round(long_side / ratio))
+        else:
+            width, height = max(1, round(long_side * ratio)), long_side
+        path = os.path.join(image_dir, f"{artwork['id']}_large.png")
+        if not os.path.exists(path):
+            write_png(path, width, height)
+        paths.append(path)
+    return paths
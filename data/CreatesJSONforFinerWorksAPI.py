@@ -4,17 +4,28 @@ Image Metadata Extractor for Xiaoran's Traditional Chinese Paintings
 Extracts image dimensions and file sizes for Finer Works API integration
 """
 
+import argparse
 import json
 import os
 import sys
-from PIL import Image
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 from pathlib import Path
 
+from image_probe import probe_image
+from instrumentation import NULL_STATS, Progress, Stats
+from json_stream import iter_json_lines, iter_json_object, open_writer
+from metadata_cache import MetadataCache
+
 class ImageMetadataExtractor:
-    def __init__(self, base_url="https://xiaoran.netlify.app/", image_dir="images/paintings/large"):
+    def __init__(self, base_url="https://xiaoran.netlify.app/", image_dir="images/paintings/large", cache=None,
+                 stats=NULL_STATS, verbose=True):
         self.base_url = base_url.rstrip('/') + '/'
         self.image_dir = image_dir
+        self.cache = cache
+        self.stats = stats
+        self.verbose = verbose
     
     def get_local_image_paths(self, artwork_id):
         """Get local image paths and URLs for artwork ID"""
@@ -45,17 +56,20 @@ class ImageMetadataExtractor:
         return None
     
     def get_image_info(self, local_path, image_url):
-        """Extract metadata from local image file"""
+        """Extract metadata from local image file, returns (image_info, error)
+
+        Prints nothing, since it may run on a worker thread; add_artwork_metadata
+        reports the file and any error under the artwork's own header
+        """
         try:
-            print(f"  📁 Processing local file: {local_path}")
-            
             # Get file size
-            file_size = os.path.getsize(local_path)
+            with self.stats.span('stat'):
+                file_size = os.path.getsize(local_path)
+            self.stats.count('image_bytes', file_size)
             
-            # Get image dimensions and format
-            with Image.open(local_path) as img:
-                width, height = img.size
-                format_type = img.format.lower() if img.format else 'png'
+            # Get image dimensions and format from the header, Pillow only for other formats
+            with self.stats.span('image_probe'):
+                width, height, format_type = probe_image(local_path)
             
             return {
                 'file_size': file_size,
@@ -63,11 +77,10 @@ class ImageMetadataExtractor:
                 'pix_h': height,
                 'format': format_type,
                 'url': image_url
-            }
+            }, None
             
         except Exception as e:
-            print(f"  ❌ Error: {e}")
-            return None
+            return None, str(e)
     
     def create_finerworks_metadata(self, artwork_id, image_paths, image_info, artwork_data):
         """Create Finer Works compatible metadata based on their API example"""
@@ -114,105 +127,221 @@ class ImageMetadataExtractor:
         
         return metadata
     
-    def process_artwork_json(self, json_file_path, output_file=None):
-        """Process the artwork JSON and add image metadata"""
+    def probe_artwork(self, artwork_id):
+        """Locate and probe the images for one artwork, returns (image_paths, image_info, error)"""
+        image_paths = self.get_local_image_paths(artwork_id)
+        if not image_paths:
+            return None, None, None
         
-        print(f"🎨 Processing artwork metadata from: {json_file_path}")
-        print(f"🌐 Base URL: {self.base_url}")
-        print(f"📁 Image directory: {self.image_dir}")
-        print("-" * 60)
+        if self.cache:
+            cached = self.cache.get(artwork_id, image_paths['large_path'])
+            if cached:
+                self.stats.count('cache_hits')
+                return image_paths, dict(cached, url=image_paths['large_url']), None
+            self.stats.count('cache_misses')
         
-        # Load existing JSON
-        try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"❌ Error loading JSON file: {e}")
-            return False
+        image_info, error = self.get_image_info(image_paths['large_path'], image_paths['large_url'])
         
-        processed_count = 0
-        error_count = 0
+        if self.cache and image_info:
+            self.cache.put(artwork_id, image_paths['large_path'], {
+                key: image_info[key] for key in ('file_size', 'pix_w', 'pix_h', 'format')
+            })
+        return image_paths, image_info, error
+    
+    def iter_probed(self, items, workers=1, probe=None):
+        """Yield (artwork_id, artwork_data, image_paths, image_info, error) in input order
+
+        probe replaces probe_artwork for this run, e.g. wrapped to time each call
+        """
+        probe = probe or self.probe_artwork
+        if workers <= 1:
+            for artwork_id, artwork_data in items:
+                yield (artwork_id, artwork_data, *probe(artwork_id))
+            return
         
-        # Process each artwork
-        for artwork_id, artwork_data in data.items():
-            title = artwork_data['artwork_info'].get('title', 'Unknown')
-            title_en = artwork_data['artwork_info'].get('title_en', '')
-            
+        # Stat and header probing is I/O bound, so spread it over a thread pool.
+        # Only a bounded window is in flight, so streamed input is never read ahead
+        # in full, and results are yielded in submission order to stay deterministic.
+        window = workers * 4
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for artwork_id, artwork_data in items:
+                pending.append((artwork_id, artwork_data, executor.submit(probe, artwork_id)))
+                if len(pending) >= window:
+                    artwork_id, artwork_data, future = pending.popleft()
+                    yield (artwork_id, artwork_data, *future.result())
+            while pending:
+                artwork_id, artwork_data, future = pending.popleft()
+                yield (artwork_id, artwork_data, *future.result())
+    
+    def load_artworks(self, json_file_path, stream=False):
+        """Return an iterable of (artwork_id, artwork_data) from a JSON or JSON Lines file"""
+        if json_file_path.endswith('.jsonl'):
+            return ((record['artwork_info']['id'], record) for record in iter_json_lines(json_file_path))
+        if stream:
+            return iter_json_object(json_file_path)
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            return json.load(f).items()
+    
+    def add_artwork_metadata(self, artwork_id, artwork_data, image_paths, image_info, error=None):
+        """Attach the Finer Works metadata to one artwork, returns False on error
+
+        Also prints the probe's file line and error here, so output stays
+        grouped per artwork whichever thread did the probing
+        """
+        title = artwork_data['artwork_info'].get('title', 'Unknown')
+        title_en = artwork_data['artwork_info'].get('title_en', '')
+        
+        if self.verbose:
             print(f"\n🖼️  Processing: {title}")
             if title_en:
                 print(f"   English: {title_en}")
-            
-            # Find local image files
-            image_paths = self.get_local_image_paths(artwork_id)
-            
-            if not image_paths:
+        
+        if not image_paths:
+            self.stats.count('missing_images')
+            if self.verbose:
                 print(f"  ❌ Large image file not found: {self.image_dir}/{artwork_id}_large.png")
-                error_count += 1
-                continue
-            
+            return False
+        
+        if self.verbose:
             print(f"  ✅ Found large image: {image_paths['large_filename']}")
             if image_paths['thumb_exists']:
                 print(f"  ✅ Found thumbnail: {image_paths['thumb_filename']}")
-            
-            # Get image metadata from local file
-            image_info = self.get_image_info(image_paths['large_path'], image_paths['large_url'])
-            
-            if image_info:
-                # Create Finer Works metadata
-                finerworks_metadata = self.create_finerworks_metadata(
-                    artwork_id, image_paths, image_info, artwork_data
-                )
-                
-                # Add to artwork data
-                artwork_data['finerworks_image'] = finerworks_metadata
-                
-                print(f"  📏 Dimensions: {image_info['pix_w']}×{image_info['pix_h']}")
-                print(f"  📦 File size: {finerworks_metadata['file_size_mb']} MB")
-                print(f"  📝 Title: {finerworks_metadata['finerworks_api_object']['title']}")
-                print(f"  ✅ Metadata added")
-                
-                processed_count += 1
-            else:
-                error_count += 1
-            
-            # No delay needed for local processing
+            print(f"  📁 Processing local file: {image_paths['large_path']}")
+        
+        if not image_info:
+            self.stats.count('probe_errors')
+            if self.verbose and error:
+                print(f"  ❌ Error: {error}")
+            return False
+        
+        # Create Finer Works metadata
+        finerworks_metadata = self.create_finerworks_metadata(
+            artwork_id, image_paths, image_info, artwork_data
+        )
+        
+        # Add to artwork data
+        artwork_data['finerworks_image'] = finerworks_metadata
+        
+        if self.verbose:
+            print(f"  📏 Dimensions: {image_info['pix_w']}×{image_info['pix_h']}")
+            print(f"  📦 File size: {finerworks_metadata['file_size_mb']} MB")
+            print(f"  📝 Title: {finerworks_metadata['finerworks_api_object']['title']}")
+            print(f"  ✅ Metadata added")
+        return True
+    
+    def process_artwork_json(self, json_file_path, output_file=None, workers=1, stream=False, progress=False,
+                             probe=None):
+        """Process the artwork JSON and add image metadata"""
+        
+        print(f"🎨 Processing artwork metadata from: {json_file_path}")
+        print(f"🌐 Base URL: {self.base_url}")
+        print(f"📁 Image directory: {self.image_dir}")
+        if workers > 1:
+            print(f"⚡ Workers: {workers}")
+        print("-" * 60)
+        
+        # Load existing JSON (lazily when streaming)
+        try:
+            items = self.load_artworks(json_file_path, stream=stream)
+        except Exception as e:
+            print(f"❌ Error loading JSON file: {e}")
+            return False
         
-        # Save updated JSON
         if output_file is None:
             output_file = f"updated_{os.path.basename(json_file_path)}"
         
+        processed_count = 0
+        error_count = 0
+        progress_line = Progress("🖼️  Artworks") if progress else None
+        
+        # Each artwork is written as soon as it is processed; the file only
+        # replaces the previous output once every record has been written
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            print(f"\n" + "="*60)
-            print(f"✅ Processing complete!")
-            print(f"📊 Results:")
-            print(f"   • Processed: {processed_count} artworks")
-            print(f"   • Errors: {error_count} artworks")
-            print(f"   • Success rate: {processed_count/(processed_count+error_count)*100:.1f}%")
-            print(f"💾 Updated file saved as: {output_file}")
-            
-            return True
-            
+            with open_writer(output_file, jsonl=output_file.endswith('.jsonl')) as writer:
+                for artwork_id, artwork_data, image_paths, image_info, error in self.iter_probed(items, workers,
+                                                                                                 probe=probe):
+                    ok = self.add_artwork_metadata(artwork_id, artwork_data, image_paths, image_info, error)
+                    if ok:
+                        processed_count += 1
+                    else:
+                        error_count += 1
+                    with self.stats.span('json_write'):
+                        writer.write(artwork_id, artwork_data)
+                    if progress_line:
+                        progress_line.update(ok)
         except Exception as e:
-            print(f"❌ Error saving file: {e}")
+            print(f"❌ Error processing or saving file: {e}")
             return False
+        finally:
+            if progress_line:
+                progress_line.close()
+            if self.cache:
+                self.cache.save()
+        
+        self.stats.count('json_bytes_written', os.path.getsize(output_file))
+        
+        print(f"\n" + "="*60)
+        print(f"✅ Processing complete!")
+        print(f"📊 Results:")
+        print(f"   • Processed: {processed_count} artworks")
+        print(f"   • Errors: {error_count} artworks")
+        print(f"   • Success rate: {processed_count/(processed_count+error_count)*100:.1f}%")
+        if self.cache:
+            print(f"   • {self.cache.summary()}")
+        print(f"💾 Updated file saved as: {output_file}")
+        self.stats.print_report()
+        
+        return True
 
 def main():
     """Main execution function"""
     
+    parser = argparse.ArgumentParser(description="Add image metadata for the Finer Works API")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of threads used to probe images (default: 1)")
+    parser.add_argument("--cache", default="image_metadata_cache.jsonl",
+                        help="metadata cache file (default: image_metadata_cache.jsonl)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="probe every image without reading or writing the cache")
+    parser.add_argument("--hash", action="store_true",
+                        help="also key the cache on a SHA-256 of the image contents")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="ignore the existing cache and re-probe every image")
+    parser.add_argument("--stream", action="store_true",
+                        help="read and write artworks one at a time instead of loading the whole file")
+    parser.add_argument("--input", default="finerworks_size_recommendations.json",
+                        help="recommendations file, .json or .jsonl (default: finerworks_size_recommendations.json)")
+    parser.add_argument("--output", default=None,
+                        help="output file, .jsonl for JSON Lines (default: updated_<input>)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="no per-artwork output, only the summary")
+    parser.add_argument("--progress", action="store_true",
+                        help="show a single progress line instead of per-artwork output")
+    parser.add_argument("--profile", metavar="OUT_JSON", default=None,
+                        help="time each stage and dump per-stage histograms to OUT_JSON")
+    args = parser.parse_args()
+    
     # Check if JSON file exists
-    json_file = "finerworks_size_recommendations.json"
+    json_file = args.input
     if not os.path.exists(json_file):
         print(f"❌ File not found: {json_file}")
         print("Please make sure the JSON file is in the current directory.")
         return
     
     # Create extractor and process
-    extractor = ImageMetadataExtractor()
+    cache = None if args.no_cache else MetadataCache(args.cache, use_hash=args.hash, rebuild=args.rebuild)
+    stats = Stats() if args.profile else NULL_STATS
+    extractor = ImageMetadataExtractor(cache=cache, stats=stats, verbose=not (args.quiet or args.progress))
+    
+    success = extractor.process_artwork_json(
+        json_file, output_file=args.output, workers=max(1, args.workers), stream=args.stream,
+        progress=args.progress
+    )
     
-    success = extractor.process_artwork_json(json_file)
+    if args.profile:
+        stats.dump(args.profile)
+        print(f"📈 Profile saved as: {args.profile}")
     
     if success:
         print(f"\n🎉 All done! You can now use the updated JSON for Finer Works API testing.")
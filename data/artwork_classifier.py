@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+畫作分類器
+將所有類別關鍵字編譯為單一正則表達式，依標題快取分類結果與尺寸偏好
+關鍵字與尺寸偏好表由 artwork_categories.json 設定
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+
+DEFAULT_CATEGORIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artwork_categories.json')
+
+
+class ArtworkClassifier:
+    def __init__(self, config, cache_size=4096):
+        """由設定字典建立分類器"""
+        default = config['default']
+        self.default = (default['artwork_type'], default['viewing_style'])
+
+        # 類別在列表中的順序即為優先順序 (0 最高)
+        self.categories = []
+        self.keyword_priority = {}
+        keywords_in_order = []
+        for priority, category in enumerate(config['categories']):
+            self.categories.append((category['artwork_type'], category['viewing_style']))
+            for keyword in category['keywords']:
+                if keyword not in self.keyword_priority:
+                    self.keyword_priority[keyword] = priority
+                    keywords_in_order.append(keyword)
+
+        # 以前瞻比對每個位置；替代項依優先順序排列，因此每個位置都會取得該處
+        # 最高優先的關鍵字，與逐類別 any(keyword in title) 的結果一致
+        if keywords_in_order:
+            alternation = '|'.join(re.escape(keyword) for keyword in keywords_in_order)
+            self.matcher = re.compile(f"(?=({alternation}))")
+        else:
+            self.matcher = None
+
+        preferences = config['size_preferences']
+        self.size_preferences_by_type = {
+            artwork_type: table for artwork_type, table in preferences.items() if artwork_type != 'default'
+        }
+        self.default_size_preferences = preferences['default']
+
+        # 同一標題在目錄變體間重複出現，快取分類結果
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CATEGORIES_FILE, cache_size=4096):
+        """從 JSON 設定檔載入分類器"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), cache_size=cache_size)
+
+    def _classify(self, title):
+        """返回 (artwork_type, viewing_style)"""
+        if not title or self.matcher is None:
+            return self.default
+
+        best = None
+        for match in self.matcher.finditer(title):
+            priority = self.keyword_priority[match.group(1)]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+
+        return self.default if best is None else self.categories[best]
+
+    def size_preferences(self, artwork_type, viewing_style):
+        """根據畫作類型返回預先建立的尺寸偏好表 (共用物件，請勿修改)"""
+        return self.size_preferences_by_type.get(artwork_type, self.default_size_preferences)
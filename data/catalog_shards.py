@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Sharded, precompressed catalog output for the web gallery
+Splits data/artworks.json into a small first-page index, fixed-size pages of
+full records and per-format category shards. Every shard gets a content-hashed
+name plus .gz and .br siblings, and a manifest lists them for the front end.
+A manifest entry has a 'gz' or 'br' size when that sibling exists; the front end
+fetches url + '.br' / '.gz', which netlify.toml serves with Content-Encoding
+
+    python data/catalog_shards.py --page-size 24
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from catalog_store import CATALOG_SUFFIX, CatalogStore
+from json_stream import iter_json_array
+from placeholders import DEFAULT_OUTPUT as DEFAULT_PLACEHOLDERS, load_placeholders
+
+try:
+    import brotli
+except ImportError:  # optional, only .gz siblings are written without it
+    brotli = None
+
+DEFAULT_PAGE_SIZE = 24
+
+# Fields the first screen needs to render a card
+SUMMARY_FIELDS = ('id', 'title', 'titleEn', 'image', 'sizeCm')
+
+# Chinese mounting formats, slugged as their formatEn; used when formatEn is empty
+FORMAT_SLUGS = {
+    '框': 'framed',
+    '軸': 'hanging-scroll',
+    '橫軸': 'horizontal-scroll',
+    '鏡片': 'mounted-panel',
+    '圓框': 'circular-frame',
+    '扇面': 'fan',
+}
+
+SHARD_PATTERN = re.compile(r'^(index|page-\d+|category-[\w-]+)\.[0-9a-f]{10}\.json(\.gz|\.br)?$')
+
+
+def summarize(artwork, placeholders=None):
+    summary = {field: artwork[field] for field in SUMMARY_FIELDS if field in artwork}
+    placeholder = (placeholders or {}).get(artwork.get('id'))
+    if placeholder:
+        # Enough to paint the card before the thumbnail arrives; the data URI stays in placeholders.json
+        summary['placeholder'] = {'color': placeholder['color'], 'blurhash': placeholder['blurhash'],
+                                  'width': placeholder['width'], 'height': placeholder['height']}
+    return summary
+
+
+def category_slug(artwork):
+    """Shard key from the mounting format (English name when present); unknown formats share one shard"""
+    format_name = artwork.get('formatEn') or ''
+    slug = re.sub(r'[^a-z0-9]+', '-', format_name.lower()).strip('-')
+    return slug or FORMAT_SLUGS.get((artwork.get('format') or '').strip(), 'other')
+
+
+def _write_if_missing(path, data):
+    """Content-hashed names never change content, so an existing file is already correct"""
+    if os.path.exists(path):
+        return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def compress_variants(data):
+    """Precompressed encodings by file suffix; gzip mtime is fixed so output is reproducible"""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+class CatalogShardWriter:
+    def __init__(self, output_dir="data/catalog", url_prefix="./data/catalog/"):
+        self.output_dir = output_dir
+        self.url_prefix = url_prefix
+        self.written = 0
+        self.files = set()
+
+    def write_shard(self, name, payload):
+        """Write one shard and its compressed siblings, returns its manifest entry"""
+        data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        filename = f"{name}.{hashlib.sha256(data).hexdigest()[:10]}.json"
+
+        entry = {'url': f"{self.url_prefix}{filename}", 'bytes': len(data)}
+        self.written += _write_if_missing(os.path.join(self.output_dir, filename), data)
+        self.files.add(filename)
+        for suffix, compressed in compress_variants(data).items():
+            if len(compressed) >= len(data):
+                continue  # tiny shards do not benefit, the front end falls back to the plain file
+            self.written += _write_if_missing(os.path.join(self.output_dir, filename + suffix), compressed)
+            self.files.add(filename + suffix)
+            entry[suffix.lstrip('.')] = len(compressed)
+        return entry
+
+    def prune(self):
+        """Delete shards from previous builds that the new manifest no longer references"""
+        removed = 0
+        for filename in os.listdir(self.output_dir):
+            if SHARD_PATTERN.match(filename) and filename not in self.files:
+                os.remove(os.path.join(self.output_dir, filename))
+                removed += 1
+        return removed
+
+
+def load_records(artworks_file):
+    if artworks_file.endswith(CATALOG_SUFFIX):
+        with CatalogStore(artworks_file) as store:
+            return list(store.iter_records())
+    return list(iter_json_array(artworks_file))
+
+
+def build_catalog_shards(artworks, writer, page_size=DEFAULT_PAGE_SIZE, placeholders=None):
+    """Write index, page and category shards for artworks, returns the manifest"""
+    os.makedirs(writer.output_dir, exist_ok=True)
+    pages = [artworks[start:start + page_size] for start in range(0, len(artworks), page_size)]
+
+    categories = {}
+    for artwork in artworks:
+        categories.setdefault(category_slug(artwork), []).append(summarize(artwork, placeholders))
+
+    return {
+        'total': len(artworks),
+        'page_size': page_size,
+        'index': writer.write_shard('index', {
+            'total': len(artworks),
+            'pages': len(pages),
+            'artworks': [summarize(artwork, placeholders) for artwork in pages[0]] if pages else []
+        }),
+        'pages': [writer.write_shard(f"page-{number}", page) for number, page in enumerate(pages, 1)],
+        'categories': {
+            slug: dict(writer.write_shard(f"category-{slug}", summaries), count=len(summaries))
+            for slug, summaries in sorted(categories.items())
+        }
+    }
+
+
+def save_manifest(manifest, output_file):
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, output_file)
+
+
+def main():
+    """Build the sharded gallery catalog from data/artworks.json"""
+    parser = argparse.ArgumentParser(description="Build sharded, precompressed catalog files for the gallery")
+    parser.add_argument("--artworks", default="data/artworks.json",
+                        help="artworks JSON array or a .momcat store built by catalog_store.py")
+    parser.add_argument("--output-dir", default="data/catalog")
+    parser.add_argument("--url-prefix", default="./data/catalog/")
+    parser.add_argument("--manifest", default="data/catalog_manifest.json")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"artworks per page shard (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument("--placeholders", default=DEFAULT_PLACEHOLDERS,
+                        help="placeholders.json from placeholders.py, merged into the summaries if present")
+    parser.add_argument("--keep-stale", action="store_true",
+                        help="keep shards from earlier builds instead of deleting them")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.artworks):
+        print(f"❌ File not found: {args.artworks}")
+        return
+
+    artworks = load_records(args.artworks)
+    writer = CatalogShardWriter(args.output_dir, args.url_prefix)
+    manifest = build_catalog_shards(artworks, writer, page_size=max(1, args.page_size),
+                                    placeholders=load_placeholders(args.placeholders))
+    save_manifest(manifest, args.manifest)
+    removed = 0 if args.keep_stale else writer.prune()
+
+    index = manifest['index']
+    print(f"✅ Catalog shards complete!")
+    print(f"   • Artworks: {manifest['total']} in {len(manifest['pages'])} pages, "
+          f"{len(manifest['categories'])} categories")
+    compressed = [f"{index[key] / 1024:.1f} KB {name}" for key, name in (('gz', 'gzip'), ('br', 'brotli'))
+                  if key in index]
+    print(f"   • First-page index: {index['bytes'] / 1024:.1f} KB"
+          + (f" ({', '.join(compressed)})" if compressed else ""))
+    print(f"   • Files written: {writer.written}, stale removed: {removed}")
+    if brotli is None:
+        print(f"   ⚠️  brotli not installed, only .gz files were written (pip install brotli)")
+    print(f"💾 Manifest saved as: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
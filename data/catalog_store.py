@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Compact memory-mapped catalog store
+Compiles data/artworks.json into a columnar binary file: fixed-width numeric
+columns, interned string columns, a sorted id index and the full records as
+deflated JSON blobs for round-trip export. Opening it is an mmap; tools only
+touch the pages of the columns they read.
+
+    python data/catalog_store.py build data/artworks.json data/catalog.momcat
+    python data/catalog_store.py export data/catalog.momcat artworks_roundtrip.json
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from json_stream import iter_json_array
+from size_parser import parse_size_cm
+
+MAGIC = b'MOMCAT1\x00'
+ALIGN = 8
+MISSING = 0xFFFFFFFF  # string column slot for a field absent from the record
+CATALOG_SUFFIX = '.momcat'
+
+# Records repeat their id in every image path and share most of their
+# productViews/products boilerplate, so each blob is stored with the id
+# factored out and deflated against a dictionary built from the first records
+ID_PLACEHOLDER = b'\x00'  # never appears in compact JSON, control characters are escaped
+ZDICT_RECORDS = 8
+ZDICT_LIMIT = 32 * 1024
+
+# name → struct/memoryview format code; missing floats are NaN, missing ints 0
+NUMERIC_COLUMNS = {
+    'height_cm': 'd',
+    'width_cm': 'd',
+    'pix_w': 'I',
+    'pix_h': 'I',
+    'file_size': 'Q',
+}
+
+STRING_COLUMNS = ('id', 'title', 'titleEn', 'sizeCm', 'format', 'year')
+
+
+def _pad(f):
+    remainder = f.tell() % ALIGN
+    if remainder:
+        f.write(b'\x00' * (ALIGN - remainder))
+
+
+class _StringTable:
+    """Interns strings; each distinct value is stored once"""
+
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def intern(self, value):
+        if value is None:
+            return MISSING
+        if not isinstance(value, str):
+            value = str(value)
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.values)
+            self.values.append(value)
+        return position
+
+
+def build_catalog_store(artworks_file, output_file, extractor=None):
+    """Compile artworks_file into output_file, probing images through extractor if given"""
+    strings = _StringTable()
+    numeric = {name: [] for name in NUMERIC_COLUMNS}
+    string_columns = {name: [] for name in STRING_COLUMNS}
+    spool_offsets = [0]
+
+    tmp_file = f"{output_file}.tmp"
+    blob_file = f"{output_file}.blobs.tmp"
+    try:
+        # Records are spooled to a side file so the catalog is never held in memory twice
+        with open(blob_file, 'wb') as blobs:
+            for artwork in iter_json_array(artworks_file):
+                height_cm, width_cm = parse_size_cm(artwork.get('sizeCm'))
+                numeric['height_cm'].append(height_cm if height_cm is not None else math.nan)
+                numeric['width_cm'].append(width_cm if width_cm is not None else math.nan)
+
+                image_info = None
+                if extractor is not None:
+                    _, image_info, _ = extractor.probe_artwork(artwork['id'])
+                numeric['pix_w'].append(image_info['pix_w'] if image_info else 0)
+                numeric['pix_h'].append(image_info['pix_h'] if image_info else 0)
+                numeric['file_size'].append(image_info['file_size'] if image_info else 0)
+
+                for name in STRING_COLUMNS:
+                    string_columns[name].append(strings.intern(artwork.get(name)))
+
+                blob = json.dumps(artwork, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                blob = blob.replace(str(artwork['id']).encode('utf-8'), ID_PLACEHOLDER)
+                blobs.write(blob)
+                spool_offsets.append(spool_offsets[-1] + len(blob))
+
+        rows = len(spool_offsets) - 1
+        encoded = [value.encode('utf-8') for value in strings.values]
+        ids = [strings.values[position] for position in string_columns['id']]
+        id_order = sorted(range(rows), key=ids.__getitem__)
+
+        header = {'rows': rows, 'sections': {}}
+        with open(tmp_file, 'wb') as f:
+            # Header is written last once offsets are known; reserve a fixed slot
+            f.write(MAGIC + b'\x00' * 4)
+            header_slot = f.tell()
+            f.write(b'\x00' * 4096)
+
+            def section(name, fmt, values):
+                _pad(f)
+                header['sections'][name] = {'offset': f.tell(), 'format': fmt, 'count': len(values)}
+                f.write(struct.pack(f'<{len(values)}{fmt}', *values))
+
+            for name, fmt in NUMERIC_COLUMNS.items():
+                section(f'column:{name}', fmt, numeric[name])
+            for name in STRING_COLUMNS:
+                section(f'strings:{name}', 'I', string_columns[name])
+
+            string_offsets = [0]
+            for value in encoded:
+                string_offsets.append(string_offsets[-1] + len(value))
+            section('string_offsets', 'Q', string_offsets)
+            _pad(f)
+            header['sections']['string_data'] = {'offset': f.tell(), 'format': 'B', 'count': string_offsets[-1]}
+            f.write(b''.join(encoded))
+
+            section('id_index', 'I', id_order)
+
+            with open(blob_file, 'rb') as blobs:
+                zdict = blobs.read(min(spool_offsets[min(rows, ZDICT_RECORDS)], ZDICT_LIMIT))
+                _pad(f)
+                header['sections']['zdict'] = {'offset': f.tell(), 'format': 'B', 'count': len(zdict)}
+                f.write(zdict)
+
+                # Offsets precede the data they index, so reserve their slot and fill it afterwards
+                _pad(f)
+                offsets_start = f.tell()
+                header['sections']['blob_offsets'] = {'offset': offsets_start, 'format': 'Q', 'count': rows + 1}
+                f.write(b'\x00' * 8 * (rows + 1))
+                header['sections']['blob_data'] = {'offset': f.tell(), 'format': 'B', 'count': 0}
+
+                blobs.seek(0)
+                blob_offsets = [0]
+                for row in range(rows):
+                    compressor = zlib.compressobj(9, zdict=zdict)
+                    blob = blobs.read(spool_offsets[row + 1] - spool_offsets[row])
+                    compressed = compressor.compress(blob) + compressor.flush()
+                    f.write(compressed)
+                    blob_offsets.append(blob_offsets[-1] + len(compressed))
+                header['sections']['blob_data']['count'] = blob_offsets[-1]
+
+            f.seek(offsets_start)
+            f.write(struct.pack(f'<{rows + 1}Q', *blob_offsets))
+
+            header_bytes = json.dumps(header).encode('utf-8')
+            if len(header_bytes) > 4096:
+                raise ValueError("Catalog header does not fit its reserved slot")
+            f.seek(len(MAGIC))
+            f.write(struct.pack('<I', len(header_bytes)))
+            f.seek(header_slot)
+            f.write(header_bytes)
+
+        os.replace(tmp_file, output_file)
+    finally:
+        for path in (tmp_file, blob_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    return rows
+
+
+class CatalogStore:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, 'rb')
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a catalog store: {path}")
+        header_length = struct.unpack_from('<I', self.mm, len(MAGIC))[0]
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(self.mm[header_start:header_start + header_length])
+        self.rows = self.header['rows']
+        self.view = memoryview(self.mm)
+
+        self._string_offsets = self._section('string_offsets')
+        self._string_data = self.header['sections']['string_data']['offset']
+        zdict = self.header['sections']['zdict']
+        self._zdict = bytes(self.mm[zdict['offset']:zdict['offset'] + zdict['count']])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self.rows
+
+    def close(self):
+        if getattr(self, 'view', None) is not None:
+            # Views must go before the mmap can close
+            self._string_offsets = None
+            self.view.release()
+            self.view = None
+        self.mm.close()
+        self.f.close()
+
+    def _section(self, name):
+        """Zero-copy typed view of one section"""
+        section = self.header['sections'][name]
+        size = struct.calcsize(section['format'])
+        start = section['offset']
+        return self.view[start:start + section['count'] * size].cast(section['format'])
+
+    def column(self, name):
+        """Numeric column as a memoryview (only its pages are read)"""
+        return self._section(f'column:{name}')
+
+    def string(self, position):
+        if position == MISSING:
+            return None
+        start = self._string_offsets[position]
+        end = self._string_offsets[position + 1]
+        return bytes(self.view[self._string_data + start:self._string_data + end]).decode('utf-8')
+
+    def string_column(self, name):
+        """Decoded string column as a list, None where the field was absent"""
+        return [self.string(position) for position in self._section(f'strings:{name}')]
+
+    def row_of(self, artwork_id):
+        """Binary search the sorted id index, returns the row or None"""
+        id_index = self._section('id_index')
+        id_strings = self._section('strings:id')
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.string(id_strings[id_index[mid]]) < artwork_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.rows and self.string(id_strings[id_index[lo]]) == artwork_id:
+            return id_index[lo]
+        return None
+
+    def record(self, row):
+        """Full original record of a row"""
+        offsets = self._section('blob_offsets')
+        start = self.header['sections']['blob_data']['offset']
+        decompressor = zlib.decompressobj(zdict=self._zdict)
+        blob = decompressor.decompress(self.view[start + offsets[row]:start + offsets[row + 1]])
+        artwork_id = self.string(self._section('strings:id')[row])
+        return json.loads(blob.replace(ID_PLACEHOLDER, artwork_id.encode('utf-8')))
+
+    def iter_artworks(self, fields=('id', 'title', 'titleEn', 'sizeCm')):
+        """Yield slim artwork dicts; blobs are only decoded for fields that are not string columns"""
+        columns = [(name, self._section(f'strings:{name}')) for name in fields if name in STRING_COLUMNS]
+        extra = [name for name in fields if name not in STRING_COLUMNS]
+        for row in range(self.rows):
+            artwork = {name: self.string(values[row]) for name, values in columns if values[row] != MISSING}
+            if extra:
+                record = self.record(row)
+                artwork.update((name, record[name]) for name in extra if name in record)
+            yield artwork
+
+    def iter_records(self):
+        for row in range(self.rows):
+            yield self.record(row)
+
+    def export_artworks(self, output_file):
+        """Write the records back in the data/artworks.json shape"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(list(self.iter_records()), f, ensure_ascii=False, indent=2)
+
+
+def iter_catalog_artworks(path, fields=('id', 'title', 'titleEn', 'sizeCm')):
+    """Artworks from a compiled store or a JSON array file, chosen by extension
+
+    fields only applies to stores; JSON files yield complete records. Like
+    iter_json_array, the file is opened before returning, so a missing path
+    raises FileNotFoundError here rather than on first iteration
+    """
+    if not path.endswith(CATALOG_SUFFIX):
+        return iter_json_array(path)
+    store = CatalogStore(path)
+
+    def artworks():
+        with store:
+            yield from store.iter_artworks(fields)
+
+    return artworks()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar memory-mapped catalog store")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="compile artworks.json into a store")
+    build.add_argument('artworks', nargs='?', default='data/artworks.json')
+    build.add_argument('output', nargs='?', default='data/catalog.momcat')
+    build.add_argument('--probe-images', action='store_true',
+                       help="fill pix_w/pix_h/file_size from images/paintings/large")
+
+    export = commands.add_parser('export', help="write the store back as artworks.json")
+    export.add_argument('store')
+    export.add_argument('output')
+
+    info = commands.add_parser('info', help="print row count and section sizes")
+    info.add_argument('store')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        extractor = None
+        if args.probe_images:
+            from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+            extractor = ImageMetadataExtractor(verbose=False)
+        rows = build_catalog_store(args.artworks, args.output, extractor=extractor)
+        print(f"✅ {rows} artworks compiled into {args.output} "
+              f"({os.path.getsize(args.output) / 1024:.1f} KB, source {os.path.getsize(args.artworks) / 1024:.1f} KB)")
+
+    elif args.command == 'export':
+        with CatalogStore(args.store) as store:
+            store.export_artworks(args.output)
+        print(f"💾 Exported {args.store} to {args.output}")
+
+    elif args.command == 'info':
+        with CatalogStore(args.store) as store:
+            print(f"📦 {args.store}: {store.rows} rows")
+            for name, section in store.header['sections'].items():
+                size = section['count'] * struct.calcsize(section['format'])
+                print(f"   • {name:24s} {size:10d} bytes")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
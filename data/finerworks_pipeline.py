@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Single pipeline from data/artworks.json to finerworks_ready_artworks.json
+Chains OptimalSizeCalculator and ImageMetadataExtractor as in-memory generator
+stages, without writing and re-parsing the intermediate recommendations file
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+from catalog_store import iter_catalog_artworks
+from instrumentation import NULL_STATS, Progress, Stats
+from json_stream import open_writer
+from metadata_cache import MetadataCache
+from optimal_size_calculator_fixed import OptimalSizeCalculator
+
+
+class StageTimer:
+    """Accumulates wall time per pipeline stage"""
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        # Probe workers report concurrently with the main thread
+        with self.lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    def timed_iter(self, stage, iterable):
+        """Yield from iterable, charging the time spent producing each item to stage"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - start)
+                return
+            self.add(stage, time.perf_counter() - start)
+            yield item
+
+    def timed_call(self, stage, func):
+        """Wrap func so each call is charged to stage (safe to call from worker threads)"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return wrapper
+
+    def print_report(self, total_seconds):
+        print(f"⏱️  Stage timings:")
+        for stage, seconds in self.seconds.items():
+            print(f"   • {stage:10s} {seconds * 1000:9.1f} ms  ({self.calls[stage]} calls)")
+        print(f"   • {'total':10s} {total_seconds * 1000:9.1f} ms (wall)")
+
+
+def run_pipeline(artworks_file, output_file, extractor, calculator=None, workers=4, progress=None):
+    """Compute sizes, probe images and write the FinerWorks-ready file in one pass"""
+    calculator = calculator or OptimalSizeCalculator()
+    timer = StageTimer()
+    start = time.perf_counter()
+
+    # Probing runs in the extractor's thread pool, so it overlaps with size
+    # calculation on the main thread. The worker time is summed across threads.
+    probe = timer.timed_call('probe', extractor.probe_artwork)
+
+    artworks = timer.timed_iter('load', iter_catalog_artworks(artworks_file))
+    recommendations = timer.timed_iter('sizes', calculator.iter_size_recommendations(artworks))
+
+    processed_count = 0
+    error_count = 0
+    try:
+        with open_writer(output_file, jsonl=output_file.endswith('.jsonl')) as writer:
+            for artwork_id, artwork_data, image_paths, image_info, error in extractor.iter_probed(
+                    recommendations, workers, probe=probe):
+                ok = extractor.add_artwork_metadata(artwork_id, artwork_data, image_paths, image_info, error)
+                if ok:
+                    processed_count += 1
+                else:
+                    error_count += 1
+                if progress:
+                    progress.update(ok)
+
+                write_start = time.perf_counter()
+                writer.write(artwork_id, artwork_data)
+                timer.add('write', time.perf_counter() - write_start)
+    finally:
+        if progress:
+            progress.close()
+        if extractor.cache:
+            extractor.cache.save()
+
+    # 'sizes' includes the time spent pulling records from 'load'
+    timer.seconds['sizes'] = timer.seconds.get('sizes', 0.0) - timer.seconds.get('load', 0.0)
+
+    return processed_count, error_count, timer, time.perf_counter() - start
+
+
+def main():
+    """Run the full artworks.json → finerworks_ready_artworks.json pipeline"""
+    parser = argparse.ArgumentParser(description="Build finerworks_ready_artworks.json in one pass")
+    parser.add_argument("--artworks", default="data/artworks.json",
+                        help="artworks JSON array or a .momcat store built by catalog_store.py")
+    parser.add_argument("--output", default="finerworks_ready_artworks.json")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="number of threads used to probe images (default: 4)")
+    parser.add_argument("--cache", default="image_metadata_cache.jsonl",
+                        help="metadata cache file (default: image_metadata_cache.jsonl)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="probe every image without reading or writing the cache")
+    parser.add_argument("--quiet", action="store_true",
+                        help="no per-artwork output, only the summary")
+    parser.add_argument("--progress", action="store_true",
+                        help="show a single progress line instead of per-artwork output")
+    parser.add_argument("--profile", metavar="OUT_JSON", default=None,
+                        help="time each hot-path step and dump per-stage histograms to OUT_JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.artworks):
+        print(f"❌ File not found: {args.artworks}")
+        return
+
+    print(f"🎨 FinerWorks pipeline: {args.artworks} → {args.output}")
+    print("-" * 60)
+
+    cache = None if args.no_cache else MetadataCache(args.cache)
+    stats = Stats() if args.profile else NULL_STATS
+    verbose = not (args.quiet or args.progress)
+    extractor = ImageMetadataExtractor(cache=cache, stats=stats, verbose=verbose)
+    calculator = OptimalSizeCalculator(stats=stats, verbose=verbose)
+    progress = Progress("🖼️  Artworks") if args.progress else None
+
+    processed_count, error_count, timer, total_seconds = run_pipeline(
+        args.artworks, args.output, extractor, calculator=calculator,
+        workers=max(1, args.workers), progress=progress
+    )
+
+    print(f"\n" + "="*60)
+    print(f"✅ Pipeline complete!")
+    print(f"📊 Results:")
+    print(f"   • Processed: {processed_count} artworks")
+    print(f"   • Errors: {error_count} artworks")
+    if cache:
+        print(f"   • {cache.summary()}")
+    timer.print_report(total_seconds)
+    print(f"💾 FinerWorks-ready file saved as: {args.output}")
+    if args.profile:
+        stats.print_report()
+        stats.dump(args.profile)
+        print(f"📈 Profile saved as: {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Finer Works v3 API for testing the uploader
+Implements test_my_credentials and add_images, and can inject transient
+failures and latency so retry, batching and resume can be exercised offline
+
+    python data/finerworks_stub_server.py --port 8765 --fail-rate 0.2
+    FINERWORKS_API_URL=http://127.0.0.1:8765/v3 python data/finerworks_uploader.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """Shared counters and the stored image library"""
+
+    def __init__(self, fail_rate=0.0, latency=0.0, max_batch=None, seed=None):
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.max_batch = max_batch
+        self.random = random.Random(seed)
+        self.images = {}
+        self.requests = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+
+class FinerWorksStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so the uploader's pooled connections are reused
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def authorized(self):
+        if self.headers.get('web_api_key') and self.headers.get('app_key'):
+            return True
+        self.send_json(401, {'message': 'Missing web_api_key or app_key'})
+        return False
+
+    def inject_failure(self):
+        """Randomly answer 503 or 429 to exercise the client's retry path"""
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            fail = state.random.random() < state.fail_rate
+            if fail:
+                state.failures += 1
+                status = state.random.choice([429, 503])
+        if state.latency:
+            time.sleep(state.latency)
+        if fail:
+            self.send_json(status, {'message': 'Injected failure'}, {'Retry-After': '0'} if status == 429 else None)
+        return fail
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/test_my_credentials'):
+            if self.authorized():
+                self.send_json(200, {'status': {'success': True}})
+            return
+        self.send_json(404, {'message': f'Unknown endpoint {self.path}'})
+
+    def do_POST(self):
+        body = self.read_json()
+        if not self.authorized() or self.inject_failure():
+            return
+
+        if self.path.rstrip('/').endswith('/add_images'):
+            images = body.get('images') or []
+            if self.state.max_batch and len(images) > self.state.max_batch:
+                self.send_json(400, {'message': f'At most {self.state.max_batch} images per request'})
+                return
+            accepted = []
+            with self.state.lock:
+                for image in images:
+                    stored = dict(image, id=len(self.state.images) + 1, guid=str(uuid.uuid4()))
+                    self.state.images[stored['guid']] = stored
+                    accepted.append(stored)
+            self.send_json(200, {'images': accepted, 'status': {'success': True}})
+            return
+
+        self.send_json(404, {'message': f'Unknown endpoint {self.path}'})
+
+
+def make_server(host='127.0.0.1', port=8765, **state_options):
+    """Create (but do not start) a stub server; port 0 picks a free port"""
+    handler = type('Handler', (FinerWorksStubHandler,), {'state': StubState(**state_options)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Finer Works API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="fraction of POSTs answered with 429/503 (default: 0)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every POST")
+    parser.add_argument("--max-batch", type=int, default=None, help="reject larger add_images batches")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, fail_rate=args.fail_rate,
+                         latency=args.latency, max_batch=args.max_batch)
+    print(f"🧪 Finer Works stub listening on http://{args.host}:{server.server_address[1]}/v3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state = server.RequestHandlerClass.state
+        print(f"\n📊 {state.requests} requests, {state.failures} injected failures, {len(state.images)} images stored")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Async Finer Works uploader
+Registers the finerworks_api_object of every artwork in finerworks_ready_artworks.json
+through the add_images endpoint, in batches over one pooled HTTP session, with
+bounded concurrency, retry with backoff and a resume journal of accepted ids
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from json_stream import iter_json_object
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+FINERWORKS_API_URL = "https://api.finerworks.com/v3"
+
+# Statuses worth retrying; other 4xx responses mean the request itself is wrong
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class UploadJournal:
+    """Append-only JSON-lines record of artworks Finer Works has accepted"""
+
+    def __init__(self, journal_file):
+        self.journal_file = journal_file
+        self.accepted = {}
+        if os.path.exists(journal_file):
+            with open(journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.accepted[entry['id']] = entry
+                    except (ValueError, KeyError):
+                        # A line cut off by an interrupted run, that artwork is retried
+                        continue
+        self.f = open(journal_file, 'a', encoding='utf-8')
+
+    def __contains__(self, artwork_id):
+        return artwork_id in self.accepted
+
+    def record(self, entries):
+        """Persist a batch before moving on, so a crash never loses accepted ids"""
+        for entry in entries:
+            self.accepted[entry['id']] = entry
+            self.f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        self.f.close()
+
+
+def iter_pending_images(ready_file, journal):
+    """Yield (artwork_id, finerworks_api_object) not yet accepted"""
+    for artwork_id, artwork_data in iter_json_object(ready_file):
+        finerworks_image = artwork_data.get('finerworks_image')
+        if finerworks_image and artwork_id not in journal:
+            yield artwork_id, finerworks_image['finerworks_api_object']
+
+
+def iter_batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class FinerWorksUploader:
+    def __init__(self, web_api_key, app_key, journal, api_url=FINERWORKS_API_URL,
+                 batch_size=10, concurrency=4, max_retries=5, backoff_base=0.5,
+                 library_name="inventory", timeout=60):
+        self.web_api_key = web_api_key
+        self.app_key = app_key
+        self.journal = journal
+        self.api_url = api_url.rstrip('/')
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.library_name = library_name
+        self.timeout = timeout
+        self.session_id = f"sync_{int(time.time())}"
+
+        self.uploaded = 0
+        self.failed = []
+        self.retries = 0
+
+    def headers(self):
+        return {
+            'Content-Type': 'application/json',
+            'web_api_key': self.web_api_key,
+            'app_key': self.app_key
+        }
+
+    def payload(self, batch):
+        """add_images body, same shape as test_upload_script.html sends"""
+        return {
+            'images': [api_object for _, api_object in batch],
+            'library': {
+                'name': self.library_name,
+                'session_id': self.session_id,
+                'account_key': '',
+                'site_id': 0
+            }
+        }
+
+    def backoff(self, attempt, retry_after=None):
+        """Exponential backoff with full jitter, honoring Retry-After when sent"""
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    async def post_batch(self, session, batch):
+        """POST one batch to add_images, retrying transient failures"""
+        url = f"{self.api_url}/add_images"
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with session.post(url, json=self.payload(batch), headers=self.headers()) as response:
+                    if response.status < 300:
+                        return await response.json(content_type=None)
+                    error = f"HTTP {response.status}: {(await response.text())[:200]}"
+                    if response.status not in RETRYABLE_STATUSES:
+                        raise RuntimeError(error)
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                raise RuntimeError(f"giving up after {attempt + 1} attempts, last error {error}")
+            self.retries += 1
+            await asyncio.sleep(self.backoff(attempt, retry_after))
+
+    def accepted_entries(self, batch, response):
+        """Match returned images to artwork ids by file_name
+
+        Images the response does not name are treated as not accepted: when some
+        are rejected, positions no longer line up, and journaling the wrong id
+        would keep that artwork from ever being retried
+        """
+        images = response.get('images') or []
+        by_file_name = {image.get('file_name'): image for image in images if image.get('file_name')}
+
+        entries = []
+        for artwork_id, api_object in batch:
+            image = by_file_name.get(api_object.get('file_name'))
+            if image is None:
+                continue
+            entries.append({
+                'id': artwork_id,
+                'finerworks_id': image.get('id'),
+                'guid': image.get('guid'),
+                'file_name': api_object.get('file_name')
+            })
+        return entries
+
+    async def upload_batch(self, session, semaphore, batch):
+        async with semaphore:
+            try:
+                response = await self.post_batch(session, batch)
+                entries = self.accepted_entries(batch, response)
+            except Exception as e:
+                # Malformed JSON, a connection dropped mid-body or an unexpected
+                # response shape fails this batch only; the rest keep uploading
+                print(f"  ❌ Batch of {len(batch)} failed: {type(e).__name__}: {e}")
+                self.failed.extend(artwork_id for artwork_id, _ in batch)
+                return
+
+        self.journal.record(entries)
+        self.uploaded += len(entries)
+
+        accepted_ids = {entry['id'] for entry in entries}
+        missing = [artwork_id for artwork_id, _ in batch if artwork_id not in accepted_ids]
+        self.failed.extend(missing)
+        print(f"  ✅ Accepted {len(entries)}/{len(batch)} images ({self.uploaded} total)")
+
+    async def upload(self, items):
+        """Upload all items; at most `concurrency` batches are in flight at a time"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            pending = set()
+            for batch in iter_batches(items, self.batch_size):
+                pending.add(asyncio.ensure_future(self.upload_batch(session, semaphore, batch)))
+                # Keep only a bounded number of batches queued behind the semaphore
+                if len(pending) >= self.concurrency * 2:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if pending:
+                await asyncio.wait(pending)
+
+
+def main():
+    """Sync finerworks_ready_artworks.json to the Finer Works image library"""
+    parser = argparse.ArgumentParser(description="Upload artwork images to Finer Works")
+    parser.add_argument("--input", default="finerworks_ready_artworks.json")
+    parser.add_argument("--journal", default="finerworks_upload_journal.jsonl",
+                        help="accepted ids, used to resume (default: finerworks_upload_journal.jsonl)")
+    parser.add_argument("--api-url", default=os.environ.get('FINERWORKS_API_URL', FINERWORKS_API_URL),
+                        help="API base URL, e.g. the local stub http://127.0.0.1:8765/v3")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-retries", type=int, default=5)
+    args = parser.parse_args()
+
+    if aiohttp is None:
+        print("❌ The uploader needs aiohttp: pip install aiohttp")
+        return
+
+    web_api_key = os.environ.get('FINERWORKS_WEB_API_KEY')
+    app_key = os.environ.get('FINERWORKS_APP_KEY')
+    if not web_api_key or not app_key:
+        print("❌ Please set FINERWORKS_WEB_API_KEY and FINERWORKS_APP_KEY")
+        return
+
+    if not os.path.exists(args.input):
+        print(f"❌ File not found: {args.input}")
+        return
+
+    journal = UploadJournal(args.journal)
+    uploader = FinerWorksUploader(
+        web_api_key, app_key, journal, api_url=args.api_url, batch_size=args.batch_size,
+        concurrency=args.concurrency, max_retries=args.max_retries
+    )
+
+    print(f"🚀 Uploading from: {args.input}")
+    print(f"🌐 API: {uploader.api_url}")
+    print(f"📒 Already accepted: {len(journal.accepted)} artworks")
+    print("-" * 60)
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(uploader.upload(iter_pending_images(args.input, journal)))
+    finally:
+        journal.close()
+
+    print(f"\n" + "="*60)
+    print(f"✅ Upload finished in {time.perf_counter() - start:.1f}s")
+    print(f"   • Uploaded: {uploader.uploaded} images")
+    print(f"   • Failed: {len(uploader.failed)} images")
+    print(f"   • Retries: {uploader.retries}")
+    if uploader.failed:
+        print(f"   ⚠️  Re-run to retry the failed images; accepted ones are skipped")
+
+
+if __name__ == "__main__":
+    main()
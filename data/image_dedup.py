@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash duplicate detection for the painting images
+Hashes every large image and thumbnail (dHash and DCT pHash, computed with NumPy
+in a process pool, cached per file), finds near-duplicate artworks (by large
+image, or thumbnail when there is none) with a BK-tree instead of comparing
+every pair, and reports duplicate clusters, thumbnails that do not match their
+large image and thumbnails without one
+
+    python data/image_dedup.py --threshold 8
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+from metadata_cache import MetadataCache
+
+HASH_SIZE = 8
+PHASH_SAMPLE = 32
+
+FILE_PATTERN = re.compile(r'^(?P<id>.+)_(?P<kind>large|thumb)\.png$')
+
+_DCT_MATRIX = None
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis, so the 2-D transform is two matrix products"""
+    import numpy as np
+
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def _bits_to_hex(bits):
+    import numpy as np
+
+    return f"{int(np.packbits(bits.ravel()).view('>u8')[0]):016x}"
+
+
+def compute_hashes(path):
+    """dHash and pHash of one image as 16-digit hex strings (runs in a worker process)"""
+    import numpy as np
+    from PIL import Image
+
+    global _DCT_MATRIX
+    if _DCT_MATRIX is None:
+        _DCT_MATRIX = _dct_matrix(PHASH_SAMPLE)
+
+    with Image.open(path) as img:
+        img.draft('L', (PHASH_SAMPLE * 4, PHASH_SAMPLE * 4))  # JPEG decodes at reduced scale
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Transparent borders hash as the white gallery background
+            rgba = img.convert('RGBA')
+            img = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            img.alpha_composite(rgba)
+        gray = img.convert('L')
+        gray.thumbnail((PHASH_SAMPLE * 4, PHASH_SAMPLE * 4), Image.BOX)
+
+    small = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    dhash = small[:, 1:] > small[:, :-1]
+
+    pixels = np.asarray(gray.resize((PHASH_SAMPLE, PHASH_SAMPLE), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT_MATRIX @ pixels @ _DCT_MATRIX.T)[:HASH_SIZE, :HASH_SIZE]
+    phash = low > np.median(low)
+
+    return {'dhash': _bits_to_hex(dhash), 'phash': _bits_to_hex(phash)}
+
+
+def hamming(a, b):
+    return (int(a, 16) ^ int(b, 16)).bit_count()
+
+
+class BKTree:
+    """Metric tree over Hamming distance; a radius query skips subtrees by the triangle inequality"""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        value = int(value, 16)
+        self.size += 1
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            distance = (value ^ node[0]).bit_count()
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value, radius):
+        """[(distance, item), ...] within radius of value"""
+        value = int(value, 16)
+        results = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = (value ^ node_value).bit_count()
+            if distance <= radius:
+                results.extend((distance, item) for item in items)
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return results
+
+
+class DuplicateFinder:
+    def __init__(self, extractor=None, thumb_dir="images/paintings/thumbnails", cache=None):
+        self.extractor = extractor or ImageMetadataExtractor(verbose=False)
+        self.thumb_dir = thumb_dir
+        self.cache = cache
+        self.hashed = 0
+        self.cached = 0
+
+    def scan(self):
+        """{artwork_id: {'large': path, 'thumb': path}} for every image file on disk"""
+        images = {}
+        for directory in (self.extractor.image_dir, self.thumb_dir):
+            if not os.path.isdir(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                match = FILE_PATTERN.match(filename)
+                if match:
+                    images.setdefault(match['id'], {})[match['kind']] = os.path.join(directory, filename)
+        return images
+
+    def hash_images(self, images, workers=None):
+        """{(artwork_id, kind): {'dhash', 'phash'}}, hashing only files the cache does not know"""
+        hashes = {}
+        jobs = []
+        for artwork_id, files in images.items():
+            for kind, path in files.items():
+                key = f"{kind}:{artwork_id}"
+                cached = self.cache.get(key, path) if self.cache else None
+                if cached:
+                    hashes[(artwork_id, kind)] = cached
+                    self.cached += 1
+                else:
+                    jobs.append(((artwork_id, kind), path))
+
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                paths = [path for _, path in jobs]
+                for ((artwork_id, kind), path), value in zip(jobs, executor.map(compute_hashes, paths, chunksize=8)):
+                    hashes[(artwork_id, kind)] = value
+                    if self.cache:
+                        self.cache.put(f"{kind}:{artwork_id}", path, value)
+            self.hashed += len(jobs)
+            if self.cache:
+                self.cache.save()
+        return hashes
+
+    def find_clusters(self, hashes, threshold):
+        """Groups of artworks within threshold of each other on both hashes
+
+        Each artwork is represented by its large image, or by its thumbnail when
+        it has none, so thumbnail-only artworks are compared in the same tree
+        """
+        sources = {}
+        for artwork_id, kind in hashes:
+            if kind == 'large' or artwork_id not in sources:
+                sources[artwork_id] = kind
+        representative = {artwork_id: hashes[(artwork_id, kind)] for artwork_id, kind in sources.items()}
+
+        tree = BKTree()
+        for artwork_id, value in representative.items():
+            tree.add(value['phash'], artwork_id)
+
+        # Union-find over the matched pairs
+        parent = {artwork_id: artwork_id for artwork_id in representative}
+
+        def root(artwork_id):
+            while parent[artwork_id] != artwork_id:
+                parent[artwork_id] = parent[parent[artwork_id]]
+                artwork_id = parent[artwork_id]
+            return artwork_id
+
+        for artwork_id, value in representative.items():
+            for distance, other in tree.search(value['phash'], threshold):
+                if other != artwork_id and hamming(value['dhash'], representative[other]['dhash']) <= threshold:
+                    parent[root(other)] = root(artwork_id)
+
+        groups = {}
+        for artwork_id in representative:
+            groups.setdefault(root(artwork_id), []).append(artwork_id)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            first = representative[members[0]]
+            clusters.append([
+                {'id': artwork_id,
+                 'source': sources[artwork_id],
+                 'phash': representative[artwork_id]['phash'],
+                 'distance': hamming(first['phash'], representative[artwork_id]['phash'])}
+                for artwork_id in members
+            ])
+        return sorted(clusters, key=len, reverse=True)
+
+    def find_mismatches(self, hashes, threshold):
+        """Thumbnails whose pHash is further than threshold from their own large image"""
+        mismatches = []
+        for (artwork_id, kind), value in hashes.items():
+            if kind != 'thumb' or (artwork_id, 'large') not in hashes:
+                continue
+            distance = hamming(value['phash'], hashes[(artwork_id, 'large')]['phash'])
+            if distance > threshold:
+                mismatches.append({'id': artwork_id, 'distance': distance})
+        return sorted(mismatches, key=lambda mismatch: -mismatch['distance'])
+
+    def report(self, workers=None, threshold=8, mismatch_threshold=12):
+        images = self.scan()
+        hashes = self.hash_images(images, workers=workers)
+        return {
+            'images': sum(len(files) for files in images.values()),
+            'threshold': threshold,
+            'mismatch_threshold': mismatch_threshold,
+            'duplicate_clusters': self.find_clusters(hashes, threshold),
+            'thumb_mismatches': self.find_mismatches(hashes, mismatch_threshold),
+            'thumbs_without_large': sorted(artwork_id for artwork_id, files in images.items()
+                                           if 'large' not in files),
+            'large_without_thumb': sorted(artwork_id for artwork_id, files in images.items()
+                                          if 'thumb' not in files),
+        }
+
+
+def main():
+    """Hash all painting images and write the duplicate report"""
+    parser = argparse.ArgumentParser(description="Find duplicate and mismatched painting images")
+    parser.add_argument("--image-dir", default="images/paintings/large")
+    parser.add_argument("--thumb-dir", default="images/paintings/thumbnails")
+    parser.add_argument("--threshold", type=int, default=8,
+                        help="max Hamming distance (of 64 bits) between duplicate images (default: 8)")
+    parser.add_argument("--mismatch-threshold", type=int, default=12,
+                        help="min distance at which a thumbnail is reported as not matching (default: 12)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", default="image_hash_cache.jsonl")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cache and re-hash every image")
+    parser.add_argument("--output", default="image_duplicates_report.json")
+    args = parser.parse_args()
+
+    finder = DuplicateFinder(
+        extractor=ImageMetadataExtractor(image_dir=args.image_dir, verbose=False),
+        thumb_dir=args.thumb_dir,
+        cache=MetadataCache(args.cache, rebuild=args.rebuild)
+    )
+
+    print(f"🔍 Hashing images in {args.image_dir} and {args.thumb_dir}")
+    report = finder.report(workers=args.workers, threshold=args.threshold,
+                           mismatch_threshold=args.mismatch_threshold)
+
+    tmp_file = f"{args.output}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, args.output)
+
+    print(f"\n" + "="*60)
+    print(f"✅ Duplicate scan complete!")
+    print(f"   • Images: {report['images']} ({finder.hashed} hashed, {finder.cached} from cache)")
+    print(f"   • Duplicate clusters: {len(report['duplicate_clusters'])}")
+    for cluster in report['duplicate_clusters'][:10]:
+        print(f"     - {', '.join(member['id'] for member in cluster)}")
+    print(f"   • Thumbnail mismatches: {len(report['thumb_mismatches'])}")
+    for mismatch in report['thumb_mismatches'][:10]:
+        print(f"     - {mismatch['id']} (distance {mismatch['distance']})")
+    print(f"   • Thumbnails without large image: {len(report['thumbs_without_large'])}")
+    print(f"   • Large images without thumbnail: {len(report['large_without_thumb'])}")
+    print(f"💾 Report saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
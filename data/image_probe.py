@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Header-only image dimension probe
+Reads the PNG IHDR chunk or the JPEG SOF marker without decoding the image,
+Pillow is only used as a fallback for other formats
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# SOF0-SOF15 carry the frame size, except DHT (C4), JPG (C8) and DAC (CC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Markers without a length field
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+
+def _probe_png(f):
+    """Read width/height from the IHDR chunk, which must directly follow the signature"""
+    header = f.read(24)
+    if len(header) < 24 or header[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', header[16:24])
+    return width, height, 'png'
+
+
+def _probe_jpeg(f):
+    """Walk the JPEG segments until a SOF marker, seeking over everything else"""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+
+        marker = f.read(1)
+        # Fill bytes: any number of 0xFF may precede a marker
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            return None
+
+        code = marker[0]
+        if code in JPEG_STANDALONE_MARKERS or code == 0x00:
+            continue
+        if code == 0xD9:  # EOI before any frame
+            return None
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+
+        if code in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return width, height, 'jpeg'
+
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def probe_image_header(path):
+    """Return (width, height, format) from the file header, or None if not PNG/JPEG"""
+    with open(path, 'rb') as f:
+        signature = f.read(8)
+        if signature == PNG_SIGNATURE:
+            f.seek(0)
+            return _probe_png(f)
+        if signature[:2] == b'\xff\xd8':
+            return _probe_jpeg(f)
+    return None
+
+
+def probe_image_pillow(path):
+    """Fallback probe through Pillow for formats the header probe does not know"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        width, height = img.size
+        format_type = img.format.lower() if img.format else 'png'
+    return width, height, format_type
+
+
+def probe_image(path):
+    """Return (width, height, format), trying the header probe before Pillow"""
+    result = probe_image_header(path)
+    if result is None:
+        result = probe_image_pillow(path)
+    return result
+
+
+def benchmark(directories, repeat=3):
+    """Compare files per second of the header probe against Pillow"""
+    paths = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            print(f"⚠️  Skipping missing directory: {directory}")
+            continue
+        paths.extend(
+            os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if os.path.isfile(os.path.join(directory, name))
+        )
+
+    if not paths:
+        print("❌ No image files found")
+        return {}
+
+    # Both probes must agree before their speed is worth comparing
+    mismatches = [p for p in paths if probe_image_header(p) not in (None, probe_image_pillow(p))]
+
+    results = {}
+    for name, probe in (('header', probe_image), ('pillow', probe_image_pillow)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for path in paths:
+                probe(path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = {
+            'seconds': best,
+            'files_per_sec': len(paths) / best if best else float('inf')
+        }
+
+    print(f"📊 Probed {len(paths)} files (best of {repeat})")
+    for name, result in results.items():
+        print(f"   • {name:7s} {result['seconds'] * 1000:8.1f} ms  {result['files_per_sec']:10.0f} files/sec")
+    print(f"   • speedup: {results['pillow']['seconds'] / results['header']['seconds']:.1f}×")
+    if mismatches:
+        print(f"   ⚠️  {len(mismatches)} files disagree with Pillow: {mismatches[:5]}")
+
+    return results
+
+
+def main():
+    """Benchmark the header probe against Pillow"""
+    parser = argparse.ArgumentParser(description="Benchmark the header-only image probe")
+    parser.add_argument("directories", nargs="*",
+                        default=["images/paintings/large", "images/paintings/thumbnails"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = benchmark(args.directories, repeat=args.repeat)
+    if not results:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
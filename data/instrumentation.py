@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Lightweight hot-path instrumentation for the data scripts
+Timing spans with per-stage histograms, counters, a single-line progress
+display and a JSON profile dump; a disabled Stats costs one method call per span
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.record(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class Stats:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        """Context manager timing one occurrence of a stage"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, duration_ns):
+        """Add one duration; histogram buckets are powers of two in microseconds"""
+        bucket = (duration_ns // 1000).bit_length()
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {'count': 0, 'total_ns': 0, 'min_ns': duration_ns,
+                                             'max_ns': duration_ns, 'buckets': {}}
+            stage['count'] += 1
+            stage['total_ns'] += duration_ns
+            stage['min_ns'] = min(stage['min_ns'], duration_ns)
+            stage['max_ns'] = max(stage['max_ns'], duration_ns)
+            stage['buckets'][bucket] = stage['buckets'].get(bucket, 0) + 1
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        stages = {}
+        for name, stage in self.stages.items():
+            stages[name] = {
+                'count': stage['count'],
+                'total_ms': stage['total_ns'] / 1e6,
+                'mean_us': stage['total_ns'] / stage['count'] / 1e3,
+                'min_us': stage['min_ns'] / 1e3,
+                'max_us': stage['max_ns'] / 1e3,
+                # "<=N" µs upper bound of each power-of-two bucket
+                'histogram_us': {f"<={(1 << bucket) - 1}": count
+                                 for bucket, count in sorted(stage['buckets'].items())}
+            }
+        return {'stages': stages, 'counters': dict(self.counters)}
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_report(self):
+        if not self.enabled or not (self.stages or self.counters):
+            return
+        print(f"⏱️  Profile:")
+        for name, stage in self.to_dict()['stages'].items():
+            print(f"   • {name:12s} {stage['total_ms']:9.1f} ms  {stage['count']:7d} calls  "
+                  f"{stage['mean_us']:8.1f} µs avg")
+        for name, value in self.counters.items():
+            print(f"   • {name:12s} {value}")
+
+
+# Shared disabled instance used when no instrumentation is requested
+NULL_STATS = Stats(enabled=False)
+
+
+class Progress:
+    """Single self-overwriting status line, redrawn at most every `interval` seconds"""
+
+    def __init__(self, label, total=None, interval=0.1, stream=sys.stderr):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.done = 0
+        self.errors = 0
+        self.start = time.perf_counter()
+        self.last_draw = 0.0
+
+    def update(self, ok=True):
+        self.done += 1
+        if not ok:
+            self.errors += 1
+        now = time.perf_counter()
+        if now - self.last_draw >= self.interval:
+            self.last_draw = now
+            self.draw(now)
+
+    def draw(self, now=None):
+        elapsed = (now or time.perf_counter()) - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        total = f"/{self.total}" if self.total else ""
+        self.stream.write(f"\r{self.label}: {self.done}{total}  errors: {self.errors}  {rate:,.0f}/s ")
+        self.stream.flush()
+
+    def close(self):
+        self.draw()
+        self.stream.write("\n")
+        self.stream.flush()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON reader/writer for the catalog scripts
+Parses top-level arrays/objects one item at a time and writes output as it goes,
+so memory stays flat however large the catalog grows
+"""
+
+import json
+import os
+
+WHITESPACE = ' \t\n\r'
+DELIMITERS = WHITESPACE + ',:]}'
+
+
+class _ChunkedDecoder:
+    """Buffered reader that decodes one JSON value at a time from a text file"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read another chunk, dropping the consumed part of the buffer"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        """Skip whitespace and return the next character without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        """Consume one of chars, returning it"""
+        char = self.next_char()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value, reading more chunks as needed"""
+        self.next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number cut off by the chunk boundary may continue in the next chunk,
+                # so only accept a value that is followed by a delimiter
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill():
+                value, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+                return value
+
+
+def _iter_container(path, open_char, close_char, read_item, chunk_size):
+    """Shared loop for top-level arrays and objects"""
+    f = open(path, 'r', encoding='utf-8')
+
+    def items():
+        with f:
+            reader = _ChunkedDecoder(f, chunk_size)
+            reader.expect(open_char)
+            if reader.next_char() == close_char:
+                reader.pos += 1
+                return
+            while True:
+                yield read_item(reader)
+                if reader.expect(',' + close_char) == close_char:
+                    return
+
+    return items()
+
+
+def iter_json_array(path, chunk_size=64 * 1024):
+    """Yield the elements of a top-level JSON array one at a time"""
+    return _iter_container(path, '[', ']', lambda reader: reader.value(), chunk_size)
+
+
+def iter_json_object(path, chunk_size=64 * 1024):
+    """Yield (key, value) pairs of a top-level JSON object one at a time"""
+    def read_pair(reader):
+        key = reader.value()
+        reader.expect(':')
+        return key, reader.value()
+
+    return _iter_container(path, '{', '}', read_pair, chunk_size)
+
+
+def iter_json_lines(path):
+    """Yield one decoded object per non-empty line of a JSON Lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class _AtomicWriter:
+    """Writes to a temp file and moves it into place on close"""
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.tmp_file = f"{output_file}.tmp"
+        self.f = open(self.tmp_file, 'w', encoding='utf-8')
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def close(self):
+        self.f.close()
+        os.replace(self.tmp_file, self.output_file)
+
+    def abort(self):
+        """Drop the partial output, leaving any previous file untouched"""
+        self.f.close()
+        if os.path.exists(self.tmp_file):
+            os.remove(self.tmp_file)
+
+
+class JsonObjectWriter(_AtomicWriter):
+    """Emits a top-level JSON object incrementally, byte-identical to json.dump(indent=2)"""
+
+    def write(self, key, value):
+        body = json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        prefix = '{\n  ' if self.count == 0 else ',\n  '
+        self.f.write(f"{prefix}{json.dumps(key, ensure_ascii=False)}: {body}")
+        self.count += 1
+
+    def close(self):
+        self.f.write('\n}' if self.count else '{}')
+        super().close()
+
+
+class JsonLinesWriter(_AtomicWriter):
+    """Emits one compact JSON record per line; the key is expected inside the record"""
+
+    def write(self, key, value):
+        self.f.write(json.dumps(value, ensure_ascii=False) + '\n')
+        self.count += 1
+
+
+def open_writer(output_file, jsonl=False):
+    """Pick the writer for the output format"""
+    return JsonLinesWriter(output_file) if jsonl else JsonObjectWriter(output_file)
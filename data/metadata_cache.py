@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Incremental file metadata cache
+Stores per-artwork values in a JSON-lines sidecar keyed by (st_size, st_mtime_ns),
+with an optional content hash so touched-but-unchanged files still hit
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+def file_fingerprint(path):
+    """Return (st_size, st_mtime_ns) for a file"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 of the file contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MetadataCache:
+    def __init__(self, cache_file, use_hash=False, rebuild=False):
+        self.cache_file = cache_file
+        self.use_hash = use_hash
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+
+        if rebuild:
+            # Start empty, the old file is replaced on save
+            self.dirty = True
+        else:
+            self.load()
+
+    def load(self):
+        """Read the JSON-lines cache, later lines win over earlier ones"""
+        if not os.path.exists(self.cache_file):
+            return
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    self.entries[entry['id']] = entry
+                except (ValueError, KeyError):
+                    # A truncated last line from an interrupted run just becomes a miss
+                    continue
+
+    def get(self, key, path):
+        """Return the cached value for key if the file at path is unchanged, else None"""
+        entry = self.entries.get(key)
+        value = None
+
+        if entry is not None:
+            st_size, st_mtime_ns = file_fingerprint(path)
+            if entry['st_size'] == st_size and entry['st_mtime_ns'] == st_mtime_ns:
+                value = entry['value']
+            elif self.use_hash and entry.get('sha256') and entry['st_size'] == st_size:
+                if file_hash(path) == entry['sha256']:
+                    # Same content with a new mtime, refresh the stat part of the key
+                    with self._lock:
+                        entry['st_mtime_ns'] = st_mtime_ns
+                        self.dirty = True
+                    value = entry['value']
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, path, value):
+        """Store value for key together with the current file fingerprint"""
+        st_size, st_mtime_ns = file_fingerprint(path)
+        entry = {
+            'id': key,
+            'st_size': st_size,
+            'st_mtime_ns': st_mtime_ns,
+            'value': value
+        }
+        if self.use_hash:
+            entry['sha256'] = file_hash(path)
+
+        with self._lock:
+            self.entries[key] = entry
+            self.dirty = True
+
+    def save(self):
+        """Rewrite the cache file atomically if anything changed"""
+        if not self.dirty:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for key in sorted(self.entries):
+                f.write(json.dumps(self.entries[key], ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.cache_file)
+        self.dirty = False
+
+    def summary(self):
+        """Short hit/miss line for the end-of-run report"""
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"Cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
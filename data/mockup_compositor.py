@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Batch mockup compositor for the original-mockup product views
+Places each painting's _large.png, framed and matted, on a room template at its
+physical size from sizeCm. Templates are photos with a known wall scale, or are
+drawn from colors when no photo is given (data/mockup_templates.json). Rendering
+runs in a process pool; each worker loads the template once for the batch, and
+artworks whose inputs are unchanged are skipped
+
+    python data/mockup_compositor.py --template living-room
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+from json_stream import iter_json_array
+from metadata_cache import MetadataCache, file_fingerprint
+from size_parser import parse_size_cm
+
+DEFAULT_TEMPLATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mockup_templates.json')
+
+# Bumped when the rendering changes, so cached outputs are redrawn
+RENDER_VERSION = 1
+
+
+@lru_cache(maxsize=8)
+def load_template(spec_json, image_fingerprint):
+    """Room background as RGB; image_fingerprint only keys the cache"""
+    from PIL import Image
+
+    spec = json.loads(spec_json)
+    if spec.get('image'):
+        with Image.open(spec['image']) as img:
+            return img.convert('RGB')
+
+    width, height = spec['size']
+    room = Image.new('RGB', (width, height), tuple(spec['wall_color']))
+    room.paste(tuple(spec['floor_color']), (0, spec['floor_y'], width, height))
+    return room
+
+
+def load_artwork_layer(path, size):
+    """Painting resized to size; draft() lets JPEG sources decode at reduced scale"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.draft('RGB', size)
+        return img.convert('RGB').resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+
+def layout(spec, height_cm, width_cm, pix_w, pix_h):
+    """Pixel boxes for the painting and its frame, scaled down only if the template cannot fit it"""
+    px_per_cm = spec['px_per_cm']
+    # sizeCm is the sheet; keep the image's own aspect within it
+    scale_cm = min(width_cm / pix_w, height_cm / pix_h)
+    art_w, art_h = pix_w * scale_cm * px_per_cm, pix_h * scale_cm * px_per_cm
+    border = (spec['frame_cm'] + spec['mat_cm']) * px_per_cm
+
+    max_w, max_h = spec['max_box']
+    fit = min(1.0, max_w / (art_w + 2 * border), max_h / (art_h + 2 * border))
+    art_w, art_h = max(1, round(art_w * fit)), max(1, round(art_h * fit))
+    return (art_w, art_h), fit
+
+
+def render_mockup(job):
+    """Composite one mockup and write it atomically (runs in a worker process)"""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    artwork_id, large_path, height_cm, width_cm, spec_json, template_fingerprint, output_path = job
+    spec = json.loads(spec_json)
+
+    with Image.open(large_path) as img:
+        pix_w, pix_h = img.size
+    (art_w, art_h), fit = layout(spec, height_cm, width_cm, pix_w, pix_h)
+
+    room = load_template(spec_json, template_fingerprint).copy()
+    layer = load_artwork_layer(large_path, (art_w, art_h))
+
+    px_per_cm = spec['px_per_cm'] * fit
+    frame = round(spec['frame_cm'] * px_per_cm)
+    mat = round(spec['mat_cm'] * px_per_cm)
+    outer_w, outer_h = art_w + 2 * (frame + mat), art_h + 2 * (frame + mat)
+    left = round(spec['anchor'][0] - outer_w / 2)
+    top = round(spec['anchor'][1] - outer_h / 2)
+
+    shadow_px = spec.get('shadow_px', 0)
+    if shadow_px:
+        shadow = Image.new('L', room.size, 0)
+        offset = shadow_px // 2
+        ImageDraw.Draw(shadow).rectangle(
+            (left + offset, top + offset, left + outer_w + offset, top + outer_h + offset), fill=110)
+        shadow = shadow.filter(ImageFilter.GaussianBlur(shadow_px))
+        room.paste((0, 0, 0), mask=shadow)
+
+    draw = ImageDraw.Draw(room)
+    draw.rectangle((left, top, left + outer_w - 1, top + outer_h - 1), fill=tuple(spec['frame_color']))
+    draw.rectangle((left + frame, top + frame, left + outer_w - frame - 1, top + outer_h - frame - 1),
+                   fill=tuple(spec['mat_color']))
+    room.paste(layer, (left + frame + mat, top + frame + mat))
+
+    tmp_path = f"{output_path}.tmp"
+    room.save(tmp_path, 'PNG', optimize=True)
+    os.replace(tmp_path, output_path)
+    return artwork_id, {'width_px': art_w, 'height_px': art_h, 'fit': round(fit, 4)}
+
+
+class MockupCompositor:
+    def __init__(self, template, extractor=None, output_dir="images/mockups/original", cache=None, force=False):
+        self.template = template
+        self.spec_json = json.dumps(template, sort_keys=True)
+        self.extractor = extractor or ImageMetadataExtractor(verbose=False)
+        self.output_dir = output_dir
+        self.cache = cache
+        self.force = force
+
+    def template_fingerprint(self):
+        return tuple(file_fingerprint(self.template['image'])) if self.template.get('image') else None
+
+    def input_key(self, artwork, template_fingerprint):
+        """Everything besides the large image itself that changes the rendered mockup"""
+        key = json.dumps([RENDER_VERSION, artwork.get('sizeCm'), self.spec_json, template_fingerprint])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+    def output_path(self, artwork_id):
+        return os.path.join(self.output_dir, f"{artwork_id}_mockup_orig.png")
+
+    def plan(self, artworks):
+        """Render jobs plus counts of (skipped unchanged, skipped hand-made, without size or image)"""
+        template_fingerprint = self.template_fingerprint()
+        jobs = []
+        unchanged = handmade = unusable = 0
+        for artwork in artworks:
+            artwork_id = artwork['id']
+            image_paths = self.extractor.get_local_image_paths(artwork_id)
+            height_cm, width_cm = parse_size_cm(artwork.get('sizeCm'))
+            if not image_paths or not height_cm or not width_cm:
+                unusable += 1
+                continue
+
+            large_path = image_paths['large_path']
+            output_path = self.output_path(artwork_id)
+            input_key = self.input_key(artwork, template_fingerprint)
+            cached = self.cache.get(artwork_id, large_path) if self.cache else None
+            if os.path.exists(output_path) and not self.force:
+                if cached and cached.get('input_key') == input_key:
+                    unchanged += 1
+                    continue
+                if not self.cache or artwork_id not in self.cache.entries:
+                    # Not rendered by us, e.g. a mockup made by hand
+                    handmade += 1
+                    continue
+
+            jobs.append((artwork_id, large_path, height_cm, width_cm,
+                         self.spec_json, template_fingerprint, output_path, input_key))
+        return jobs, unchanged, handmade, unusable
+
+    def render(self, jobs, workers=None):
+        os.makedirs(self.output_dir, exist_ok=True)
+        rendered = []
+        if not jobs:
+            return rendered
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Every job shares the template, so each worker loads it once
+            for job, (artwork_id, info) in zip(jobs, executor.map(render_mockup, [job[:-1] for job in jobs],
+                                                                  chunksize=4)):
+                rendered.append((artwork_id, info))
+                if info['fit'] < 1:
+                    print(f"  🖼️  {artwork_id}: scaled to {info['fit']:.0%} to fit the template")
+                else:
+                    print(f"  🖼️  {artwork_id}: {info['width_px']}×{info['height_px']} px")
+                if self.cache:
+                    self.cache.put(artwork_id, job[1], dict(info, input_key=job[-1]))
+        if self.cache:
+            self.cache.save()
+        return rendered
+
+
+def load_templates(path=DEFAULT_TEMPLATES_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    """Render original-mockup images for every artwork with a large image and a size"""
+    parser = argparse.ArgumentParser(description="Composite room mockups for the artworks")
+    parser.add_argument("--artworks", default="data/artworks.json")
+    parser.add_argument("--templates", default=DEFAULT_TEMPLATES_FILE)
+    parser.add_argument("--template", default=None, help="template name (default: the file's default)")
+    parser.add_argument("--output-dir", default="images/mockups/original")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", default="mockup_cache.jsonl")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render everything, including existing mockups not made by this tool")
+    args = parser.parse_args()
+
+    templates = load_templates(args.templates)
+    name = args.template or templates['default']
+    if name not in templates['templates']:
+        print(f"❌ Unknown template: {name} (available: {', '.join(templates['templates'])})")
+        return
+
+    compositor = MockupCompositor(templates['templates'][name], output_dir=args.output_dir,
+                                  cache=MetadataCache(args.cache), force=args.force)
+
+    print(f"🏠 Rendering mockups with template: {name}")
+    print("-" * 60)
+    jobs, unchanged, handmade, unusable = compositor.plan(iter_json_array(args.artworks))
+    rendered = compositor.render(jobs, workers=args.workers)
+
+    print(f"\n" + "="*60)
+    print(f"✅ Mockups complete!")
+    print(f"   • Rendered: {len(rendered)}")
+    print(f"   • Unchanged (skipped): {unchanged}")
+    print(f"   • Existing, not generated (kept): {handmade}")
+    print(f"   • Without large image or parsable size: {unusable}")
+    print(f"💾 Output directory: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
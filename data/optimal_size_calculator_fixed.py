@@ -5,98 +5,56 @@
 不處理圖片，只計算最佳展示比例
 """
 
+import argparse
 import json
 import math
 from pathlib import Path
 import logging
 
+from artwork_classifier import ArtworkClassifier
+from catalog_store import CATALOG_SUFFIX, iter_catalog_artworks
+from instrumentation import NULL_STATS, Progress, Stats
+from json_stream import open_writer
+from print_size_index import DEFAULT_SIZES_FILE, load_size_index
+from size_parser import parse_size_cm
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 計算器讀取的欄位；.momcat 直接由字串欄提供，不需解碼完整記錄
+ARTWORK_FIELDS = ('id', 'title', 'titleEn', 'sizeCm')
+
+def load_artworks(artworks_file, fields=ARTWORK_FIELDS):
+    """載入畫作列表：JSON 陣列讀入完整記錄，.momcat 只讀取 fields"""
+    if artworks_file.endswith(CATALOG_SUFFIX):
+        return list(iter_catalog_artworks(artworks_file, fields))
+    with open(artworks_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 class OptimalSizeCalculator:
-    def __init__(self):
-        """初始化尺寸計算器"""
-        pass
+    def __init__(self, classifier=None, stats=NULL_STATS, verbose=True, size_index=None, snap_tolerance=0.1):
+        """初始化尺寸計算器；提供 size_index 時優先對齊標準印刷尺寸"""
+        self.classifier = classifier or ArtworkClassifier.from_file()
+        self.stats = stats
+        self.verbose = verbose
+        self.size_index = size_index
+        self.snap_tolerance = snap_tolerance
         
     def parse_size_cm(self, size_str):
-        """解析尺寸字串，返回 (height_cm, width_cm)"""
-        if not size_str:
-            return None, None
-        
-        size_str = size_str.replace('×', 'x').replace('X', 'x').replace(' ', '')
-        
-        if 'x' in size_str:
-            parts = size_str.split('x')
-            if len(parts) == 2:
-                try:
-                    height = float(parts[0])
-                    width = float(parts[1])
-                    return height, width
-                except ValueError:
-                    pass
-        return None, None
+        """解析尺寸字串，返回 SizeCm(height_cm, width_cm)"""
+        return parse_size_cm(size_str)
 
     def cm_to_inches(self, cm):
         """轉換公分到英寸"""
         return cm / 2.54
 
     def analyze_artwork_characteristics(self, artwork):
-        """分析畫作特性，決定適合的展示風格"""
-        title = artwork.get('title', '')
-        title_en = artwork.get('titleEn', '')
-        description = artwork.get('description', '')
-        
-        # 判斷畫作類型
-        artwork_type = 'general'
-        viewing_style = 'comfortable'
-        
-        # 山水畫 - 適合較大尺寸，氣勢展示
-        if any(keyword in title for keyword in ['山', '水', '峽', '瀑', '雲', '海']):
-            artwork_type = 'landscape'
-            viewing_style = 'dramatic'
-            
-        # 花鳥畫 - 適合中等尺寸，細節欣賞
-        elif any(keyword in title for keyword in ['花', '鳥', '梅', '竹', '菊', '蘭']):
-            artwork_type = 'flower_bird'
-            viewing_style = 'comfortable'
-            
-        # 書法 - 適合較小尺寸，近距離欣賞
-        elif any(keyword in title for keyword in ['書', '字', '經', '詩', '序']):
-            artwork_type = 'calligraphy'
-            viewing_style = 'intimate'
-            
-        # 人物、動物 - 適中尺寸
-        elif any(keyword in title for keyword in ['人', '母', '熊', '雀', '鳥']):
-            artwork_type = 'figure_animal'
-            viewing_style = 'comfortable'
-            
-        return artwork_type, viewing_style
+        """分析畫作特性，決定適合的展示風格 (關鍵字見 artwork_categories.json)"""
+        return self.classifier.classify(artwork.get('title', ''))
 
     def get_size_preferences(self, artwork_type, viewing_style):
-        """根據畫作類型獲得尺寸偏好"""
-        base_preferences = {
-            'small': {'min': 8, 'max': 12},
-            'medium': {'min': 12, 'max': 18},
-            'large': {'min': 18, 'max': 24}
-        }
-        
-        # 根據畫作類型調整
-        if artwork_type == 'landscape':
-            # 山水畫傾向於更大尺寸
-            base_preferences = {
-                'medium': {'min': 12, 'max': 18},
-                'large': {'min': 18, 'max': 24},
-                'statement': {'min': 24, 'max': 36}
-            }
-            
-        elif artwork_type == 'calligraphy':
-            # 書法傾向於較小精緻尺寸
-            base_preferences = {
-                'small': {'min': 8, 'max': 12},
-                'medium': {'min': 12, 'max': 18}
-            }
-            
-        return base_preferences
+        """根據畫作類型獲得尺寸偏好 (共用快取物件，請勿修改)"""
+        return self.classifier.size_preferences(artwork_type, viewing_style)
 
     def calculate_recommendation_score(self, width, height, original_ratio):
         """計算推薦分數 (1-100)"""
@@ -127,10 +85,13 @@ class OptimalSizeCalculator:
 
     def calculate_optimal_sizes(self, artwork):
         """計算最適合的展示尺寸"""
-        height_cm, width_cm = self.parse_size_cm(artwork.get('sizeCm', ''))
+        with self.stats.span('parse'):
+            height_cm, width_cm = self.parse_size_cm(artwork.get('sizeCm', ''))
         
         if not height_cm or not width_cm:
-            logger.warning(f"無法解析尺寸: {artwork.get('id', 'unknown')}")
+            self.stats.count('unparsed_sizes')
+            if self.verbose:
+                logger.warning(f"無法解析尺寸: {artwork.get('id', 'unknown')}")
             return []
         
         # 轉換為英寸
@@ -139,98 +100,262 @@ class OptimalSizeCalculator:
         original_ratio = width_in / height_in
         
         # 分析畫作特性
-        artwork_type, viewing_style = self.analyze_artwork_characteristics(artwork)
-        
-        # 根據畫作類型調整尺寸偏好
-        size_preferences = self.get_size_preferences(artwork_type, viewing_style)
+        with self.stats.span('classify'):
+            artwork_type, viewing_style = self.analyze_artwork_characteristics(artwork)
+            
+            # 根據畫作類型調整尺寸偏好
+            size_preferences = self.get_size_preferences(artwork_type, viewing_style)
         
-        all_sizes = []
+        # 優先對齊標準尺寸，不足3個時以自行產生的尺寸補足
+        snapped = []
+        if self.size_index:
+            with self.stats.span('snap'):
+                snapped = self.snap_to_standard_sizes(original_ratio, size_preferences)
+            if len(snapped) >= 3:
+                return snapped
+            self.stats.count('topped_up_sizes' if snapped else 'custom_sizes')
         
-        # 為每個尺寸範圍生成候選尺寸
-        for size_category, size_range in size_preferences.items():
-            min_size = size_range['min']
-            max_size = size_range['max']
+        with self.stats.span('score'):
+            all_sizes = []
             
-            # 嘗試該範圍內的幾個目標尺寸
-            for target_size in [min_size, (min_size + max_size) / 2, max_size]:
-                if original_ratio > 1:
-                    # 橫向畫作 (寬 > 高)
-                    width = target_size
-                    height = width / original_ratio
-                else:
-                    # 直向畫作 (高 > 寬)
-                    height = target_size
-                    width = height * original_ratio
-                
-                # 保持精確比例的四捨五入
-                width_rounded = round(width)
-                height_rounded = round(height)
-                
-                # 驗證比例是否保持一致
-                new_ratio = width_rounded / height_rounded
-                if abs(new_ratio - original_ratio) > 0.1:
-                    # 如果比例偏差太大，調整一個維度
+            # 為每個尺寸範圍生成候選尺寸
+            for size_category, size_range in size_preferences.items():
+                min_size = size_range['min']
+                max_size = size_range['max']
+            
+                # 嘗試該範圍內的幾個目標尺寸
+                for target_size in [min_size, (min_size + max_size) / 2, max_size]:
                     if original_ratio > 1:
-                        height_rounded = round(width_rounded / original_ratio)
+                        # 橫向畫作 (寬 > 高)
+                        width = target_size
+                        height = width / original_ratio
                     else:
-                        width_rounded = round(height_rounded * original_ratio)
+                        # 直向畫作 (高 > 寬)
+                        height = target_size
+                        width = height * original_ratio
                 
-                # 檢查是否在合理範圍內
-                if (min_size <= max(width_rounded, height_rounded) <= max_size and
-                    min(width_rounded, height_rounded) >= 6):
+                    # 保持精確比例的四捨五入
+                    width_rounded = round(width)
+                    height_rounded = round(height)
+                
+                    # 驗證比例是否保持一致
+                    new_ratio = width_rounded / height_rounded
+                    if abs(new_ratio - original_ratio) > 0.1:
+                        # 如果比例偏差太大，調整一個維度
+                        if original_ratio > 1:
+                            height_rounded = round(width_rounded / original_ratio)
+                        else:
+                            width_rounded = round(height_rounded * original_ratio)
+                
+                    # 檢查是否在合理範圍內
+                    if (min_size <= max(width_rounded, height_rounded) <= max_size and
+                        min(width_rounded, height_rounded) >= 6):
                     
-                    score = self.calculate_recommendation_score(width_rounded, height_rounded, original_ratio)
+                        score = self.calculate_recommendation_score(width_rounded, height_rounded, original_ratio)
                     
-                    all_sizes.append({
-                        'width_inches': width_rounded,
-                        'height_inches': height_rounded,
-                        'score': score
-                    })
-        
-        # 去除重複尺寸
-        unique_sizes = {}
-        for size in all_sizes:
-            key = f"{size['width_inches']}x{size['height_inches']}"
-            if key not in unique_sizes or size['score'] > unique_sizes[key]['score']:
-                unique_sizes[key] = size
-        
-        # 按分數排序，取前2-3個
-        sorted_sizes = sorted(unique_sizes.values(), key=lambda x: x['score'], reverse=True)
-        
-        # 返回最多3個最佳尺寸，移除分數
-        result = []
-        for i, size in enumerate(sorted_sizes[:3]):
-            result.append({
-                'width_inches': size['width_inches'],
-                'height_inches': size['height_inches']
-            })
-        
-        return result
+                        all_sizes.append({
+                            'width_inches': width_rounded,
+                            'height_inches': height_rounded,
+                            'score': score
+                        })
+            
+            # 去除重複尺寸
+            unique_sizes = {}
+            for size in all_sizes:
+                key = f"{size['width_inches']}x{size['height_inches']}"
+                if key not in unique_sizes or size['score'] > unique_sizes[key]['score']:
+                    unique_sizes[key] = size
+            
+            # 按分數排序，取前2-3個
+            sorted_sizes = sorted(unique_sizes.values(), key=lambda x: x['score'], reverse=True)
+            
+            # 略過已由標準尺寸提供的尺寸
+            taken = {(size['width_inches'], size['height_inches']) for size in snapped}
+            sorted_sizes = [size for size in sorted_sizes
+                            if (size['width_inches'], size['height_inches']) not in taken]
+            
+            # 返回最多3個最佳尺寸，移除分數
+            result = list(snapped)
+            for i, size in enumerate(sorted_sizes[:3 - len(snapped)]):
+                entry = {
+                    'width_inches': size['width_inches'],
+                    'height_inches': size['height_inches']
+                }
+                if self.size_index:
+                    entry['quality'] = self.size_quality(
+                        size['width_inches'], size['height_inches'], original_ratio, 'custom'
+                    )
+                result.append(entry)
+            
+            return result
 
-    def generate_size_recommendations(self, artworks_file):
-        """為所有畫作生成尺寸建議"""
-        
-        try:
-            with open(artworks_file, 'r', encoding='utf-8') as f:
-                artworks = json.load(f)
-        except FileNotFoundError:
-            logger.error(f"找不到文件: {artworks_file}")
-            return {}
+    def size_quality(self, width, height, original_ratio, source):
+        """候選尺寸品質：來源 (standard/custom)、相對比例誤差與推薦分數"""
+        return {
+            'source': source,
+            'ratio_error': round(abs((width / height) / original_ratio - 1), 4),
+            'score': self.calculate_recommendation_score(width, height, original_ratio)
+        }
+
+    def snap_to_standard_sizes(self, original_ratio, size_preferences):
+        """從標準尺寸索引取出比例最接近且長邊在偏好範圍內的尺寸，最多3個"""
+        min_long = min(size_range['min'] for size_range in size_preferences.values())
+        max_long = max(size_range['max'] for size_range in size_preferences.values())
         
-        recommendations = {}
+        # 取 tolerance 內的全部候選再評分，避免比例最近的幾個擠掉分數較高的尺寸
+        candidates = self.size_index.nearest(
+            original_ratio, min_long, max_long, tolerance=self.snap_tolerance
+        )
         
-        logger.info(f"分析 {len(artworks)} 幅畫作...")
+        # 分數高者優先，同分時比例誤差小、尺寸小者優先
+        ranked = sorted(candidates, key=lambda candidate: (
+            -self.calculate_recommendation_score(candidate[0], candidate[1], original_ratio),
+            candidate[2],
+            max(candidate[0], candidate[1])
+        ))
         
+        return [
+            {
+                'width_inches': width,
+                'height_inches': height,
+                'quality': self.size_quality(width, height, original_ratio, 'standard')
+            }
+            for width, height, _ in ranked[:3]
+        ]
+
+    def calculate_recommendation_scores(self, width, height, original_ratio):
+        """calculate_recommendation_score 的向量化版本，輸入為 NumPy 陣列"""
+        import numpy as np
+
+        score = np.full(width.shape, 50, dtype=np.int64)
+
+        max_dim = np.maximum(width, height)
+        popular = (max_dim >= 12) & (max_dim <= 20)
+        usable = ~popular & (max_dim >= 8) & (max_dim <= 24)
+        score += np.where(popular, 30, 0)
+        score += np.where(usable, 20, 0)
+        score -= np.where(~popular & ~usable & (max_dim > 30), 10, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio_diff = np.abs(width / height - original_ratio)
+        score += np.where(ratio_diff < 0.05, 20, np.where(ratio_diff < 0.1, 10, 0))
+
+        score -= np.where(np.minimum(width, height) < 6, 20, 0)
+
+        return np.clip(score, 0, 100)
+
+    def calculate_optimal_sizes_batch(self, artworks):
+        """批次計算所有畫作的展示尺寸，結果與 calculate_optimal_sizes 逐一計算相同"""
+        import numpy as np
+
+        # 標準尺寸模式以二分搜尋逐一對齊，已是 O(log n)，不走向量化路徑
+        if self.size_index:
+            return [self.calculate_optimal_sizes(artwork) for artwork in artworks]
+
+        results = [[] for _ in artworks]
+
+        # 字串解析與分類無法向量化，先逐一取出比例與候選目標尺寸
+        rows = []
+        ratios = []
+        candidate_tables = {}
+        row_tables = []
+        for i, artwork in enumerate(artworks):
+            with self.stats.span('parse'):
+                height_cm, width_cm = self.parse_size_cm(artwork.get('sizeCm', ''))
+            if not height_cm or not width_cm:
+                self.stats.count('unparsed_sizes')
+                if self.verbose:
+                    logger.warning(f"無法解析尺寸: {artwork.get('id', 'unknown')}")
+                continue
+
+            with self.stats.span('classify'):
+                artwork_type, viewing_style = self.analyze_artwork_characteristics(artwork)
+                table_key = (artwork_type, viewing_style)
+                if table_key not in candidate_tables:
+                    # 每種偏好表轉成 (min, max, target) 候選列
+                    candidate_tables[table_key] = [
+                        (size_range['min'], size_range['max'], target_size)
+                        for size_range in self.get_size_preferences(artwork_type, viewing_style).values()
+                        for target_size in [size_range['min'], (size_range['min'] + size_range['max']) / 2, size_range['max']]
+                    ]
+
+            rows.append(i)
+            ratios.append(self.cm_to_inches(width_cm) / self.cm_to_inches(height_cm))
+            row_tables.append(table_key)
+
+        if not rows:
+            return results
+
+        # 候選數不足的偏好表以 NaN 補齊，並標記為無效
+        table_keys = list(candidate_tables)
+        n_candidates = max(len(c) for c in candidate_tables.values())
+        tables = np.full((len(table_keys), n_candidates, 3), np.nan)
+        for t, table_key in enumerate(table_keys):
+            tables[t, :len(candidate_tables[table_key])] = candidate_tables[table_key]
+        table_index = {table_key: t for t, table_key in enumerate(table_keys)}
+        bounds = tables[np.array([table_index[k] for k in row_tables])]
+        min_size, max_size, target = bounds[..., 0], bounds[..., 1], bounds[..., 2]
+        present = ~np.isnan(target)
+
+        original_ratio = np.array(ratios)[:, None]
+        landscape = original_ratio > 1
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            width = np.where(landscape, target, target * original_ratio)
+            height = np.where(landscape, target / original_ratio, target)
+
+            # 保持精確比例的四捨五入 (np.round 與 round() 同為銀行家捨入)
+            width_rounded = np.round(width)
+            height_rounded = np.round(height)
+
+            # 比例偏差太大時調整一個維度
+            drift = np.abs(width_rounded / height_rounded - original_ratio) > 0.1
+            height_rounded = np.where(drift & landscape, np.round(width_rounded / original_ratio), height_rounded)
+            width_rounded = np.where(drift & ~landscape, np.round(height_rounded * original_ratio), width_rounded)
+
+        longest = np.maximum(width_rounded, height_rounded)
+        valid = (present & (min_size <= longest) & (longest <= max_size)
+                 & (np.minimum(width_rounded, height_rounded) >= 6))
+
+        score = self.calculate_recommendation_scores(width_rounded, height_rounded, original_ratio)
+
+        # 去除重複尺寸：同一尺寸分數相同，保留第一次出現者
+        key = np.where(valid, width_rounded * 100000 + height_rounded, -1)
+        same = (key[:, :, None] == key[:, None, :]) & valid[:, :, None] & valid[:, None, :]
+        earlier = np.tril(np.ones((n_candidates, n_candidates), dtype=bool), k=-1)
+        duplicate = (same & earlier).any(axis=2)
+        keep = valid & ~duplicate
+
+        # 按分數排序 (穩定排序，與 sorted() 相同的同分次序)，取前3個
+        ranked = np.where(keep, score, -1)
+        order = np.argsort(-ranked, axis=1, kind='stable')[:, :3]
+        top_score = np.take_along_axis(ranked, order, axis=1)
+        top_score = top_score.tolist()
+        top_width = np.take_along_axis(width_rounded, order, axis=1).astype(np.int64).tolist()
+        top_height = np.take_along_axis(height_rounded, order, axis=1).astype(np.int64).tolist()
+
+        for r, i in enumerate(rows):
+            results[i] = [
+                {'width_inches': w, 'height_inches': h}
+                for w, h, sc in zip(top_width[r], top_height[r], top_score[r])
+                if sc >= 0
+            ]
+
+        return results
+
+    def iter_size_recommendations(self, artworks, progress=None):
+        """逐一產生 (art_id, 建議記錄)，可接受串流讀入的畫作"""
         for artwork in artworks:
             art_id = artwork['id']
             title = artwork.get('title', 'Unknown')
             
-            logger.info(f"分析: {title}")
+            if self.verbose:
+                logger.info(f"分析: {title}")
             
             optimal_sizes = self.calculate_optimal_sizes(artwork)
             
             if optimal_sizes:
-                recommendations[art_id] = {
+                yield art_id, {
                     'artwork_info': {
                         'id': art_id,
                         'title': title,
@@ -239,14 +364,45 @@ class OptimalSizeCalculator:
                     },
                     'recommended_sizes': optimal_sizes
                 }
-            else:
+            elif self.verbose:
                 logger.warning(f"無法為 {title} 計算尺寸")
+            
+            if progress:
+                progress.update(bool(optimal_sizes))
+
+    def generate_size_recommendations(self, artworks_file, progress=None):
+        """為所有畫作生成尺寸建議"""
+        
+        try:
+            artworks = load_artworks(artworks_file)
+        except FileNotFoundError:
+            logger.error(f"找不到文件: {artworks_file}")
+            return {}
+        
+        if self.verbose:
+            logger.info(f"分析 {len(artworks)} 幅畫作...")
         
-        return recommendations
+        return dict(self.iter_size_recommendations(artworks, progress=progress))
+
+    def stream_size_recommendations(self, artworks_file, output_file, jsonl=False, progress=None):
+        """串流模式：逐筆讀入畫作、計算並寫出，記憶體用量不隨畫作數增長"""
+        try:
+            artworks = iter_catalog_artworks(artworks_file)
+        except FileNotFoundError:
+            logger.error(f"找不到文件: {artworks_file}")
+            return 0
+        
+        with open_writer(output_file, jsonl=jsonl) as writer:
+            for art_id, recommendation in self.iter_size_recommendations(artworks, progress=progress):
+                with self.stats.span('json_write'):
+                    writer.write(art_id, recommendation)
+        
+        logger.info(f"建議已保存到: {output_file}")
+        return writer.count
 
     def save_recommendations(self, recommendations, output_file):
         """保存建議到JSON文件"""
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with self.stats.span('json_write'), open(output_file, 'w', encoding='utf-8') as f:
             json.dump(recommendations, f, indent=2, ensure_ascii=False)
         
         logger.info(f"建議已保存到: {output_file}")
@@ -280,13 +436,44 @@ class OptimalSizeCalculator:
             
             count += 1
 
+def finish_profile(stats, profile_file):
+    """輸出各階段耗時報告與 JSON 分佈"""
+    if not profile_file:
+        return
+    stats.print_report()
+    stats.dump(profile_file)
+    print(f"📈 效能記錄已保存到: {profile_file}")
+
 def main():
     """主執行函數"""
-    calculator = OptimalSizeCalculator()
+    parser = argparse.ArgumentParser(description="中國傳統畫最適展示尺寸計算器")
+    parser.add_argument("--stream", action="store_true",
+                        help="逐筆讀寫，不將整個目錄載入記憶體")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="以 JSON Lines 格式輸出 (搭配 --stream)")
+    parser.add_argument("--standard-sizes", nargs="?", const=DEFAULT_SIZES_FILE, default=None,
+                        metavar="TABLE", help="對齊 Finerworks 標準尺寸表 (預設 data/finerworks_standard_sizes.json)")
+    parser.add_argument("--catalog", metavar="STORE", default=None,
+                        help="從 catalog_store.py 編譯的 .momcat 讀取畫作，取代 data/artworks.json")
+    parser.add_argument("--quiet", action="store_true",
+                        help="不逐幅輸出記錄，只顯示摘要")
+    parser.add_argument("--progress", action="store_true",
+                        help="以單行進度取代逐幅記錄")
+    parser.add_argument("--profile", metavar="OUT_JSON", default=None,
+                        help="記錄各階段耗時並將分佈輸出到 OUT_JSON")
+    args = parser.parse_args()
+    
+    stats = Stats() if args.profile else NULL_STATS
+    size_index = None
+    if args.standard_sizes:
+        size_index = load_size_index(args.standard_sizes, cache_file="finerworks_standard_sizes.idx")
+    calculator = OptimalSizeCalculator(stats=stats, verbose=not (args.quiet or args.progress),
+                                       size_index=size_index)
+    progress = Progress("🎨 畫作") if args.progress else None
     
     # 設定文件路徑
-    artworks_file = "data/artworks.json"
-    output_file = "finerworks_size_recommendations.json"
+    artworks_file = args.catalog or "data/artworks.json"
+    output_file = "finerworks_size_recommendations.jsonl" if args.jsonl else "finerworks_size_recommendations.json"
     
     print("🎨 中國傳統畫最適展示尺寸計算器")
     print("專為 Finerworks 精確尺寸設計")
@@ -295,15 +482,31 @@ def main():
     print(f"輸出: {output_file}")
     print()
     
+    if args.stream or args.jsonl:
+        count = calculator.stream_size_recommendations(artworks_file, output_file, jsonl=args.jsonl,
+                                                       progress=progress)
+        if progress:
+            progress.close()
+        finish_profile(stats, args.profile)
+        if count:
+            print(f"\n✅ 完成！{count} 幅畫作的尺寸建議已生成")
+        else:
+            print("❌ 沒有生成任何建議，請檢查數據文件")
+        return
+    
     # 生成建議
-    recommendations = calculator.generate_size_recommendations(artworks_file)
+    recommendations = calculator.generate_size_recommendations(artworks_file, progress=progress)
+    if progress:
+        progress.close()
     
     if recommendations:
         # 保存結果
         calculator.save_recommendations(recommendations, output_file)
         
         # 顯示摘要
-        calculator.print_summary(recommendations)
+        if not (args.quiet or args.progress):
+            calculator.print_summary(recommendations)
+        finish_profile(stats, args.profile)
         
         print(f"\n✅ 完成！{len(recommendations)} 幅畫作的尺寸建議已生成")
         print(f"🔧 可直接用於 Finerworks API 整合")
@@ -312,4 +515,4 @@ def main():
         print("❌ 沒有生成任何建議，請檢查數據文件")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
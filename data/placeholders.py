@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Low-quality image placeholders for progressive gallery loading
+For every artwork image computes a BlurHash, a dominant color and a ~20px WebP
+data URI from a downsampled copy of the thumbnail (the large image when there
+is no thumbnail). The math runs in NumPy, files are processed in a process pool
+and results are cached by file fingerprint. Output is data/placeholders.json,
+which catalog_shards.py folds into the catalog shards
+
+    python data/placeholders.py
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+from json_stream import iter_json_array
+from metadata_cache import MetadataCache
+
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+SAMPLE_SIZE = 32      # long side of the image the hash and color are computed from
+PREVIEW_SIZE = 20     # long side of the inlined preview
+PREVIEW_QUALITY = 40
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'placeholders.json')
+
+
+def _base83(value, length):
+    return ''.join(BASE83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _srgb_to_linear(pixels):
+    import numpy as np
+
+    v = pixels / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(value):
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash_encode(pixels, x_components=4, y_components=3):
+    """BlurHash of an (h, w, 3) uint8 array, all DCT components in one einsum"""
+    import numpy as np
+
+    height, width = pixels.shape[:2]
+    linear = _srgb_to_linear(pixels.astype(np.float64))
+
+    basis_x = np.cos(np.pi * np.arange(x_components)[:, None] * np.arange(width)[None, :] / width)
+    basis_y = np.cos(np.pi * np.arange(y_components)[:, None] * np.arange(height)[None, :] / height)
+    factors = np.einsum('jy,ix,yxc->jic', basis_y, basis_x, linear) / (width * height)
+    factors[1:] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(-1, 3)  # row-major: y component outer, x inner, as the format requires
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if len(ac):
+        quantised_max = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+        maximum = (quantised_max + 1) / 166
+    else:
+        quantised_max, maximum = 0, 1.0
+    result += _base83(quantised_max, 1)
+
+    r, g, b = (_linear_to_srgb(channel) for channel in dc)
+    result += _base83((r << 16) + (g << 8) + b, 4)
+
+    scaled = ac / maximum
+    quantised = np.clip(np.floor(np.sign(scaled) * np.abs(scaled) ** 0.5 * 9 + 9.5), 0, 18).astype(int)
+    for qr, qg, qb in quantised:
+        result += _base83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return result
+
+
+def dominant_color(pixels, bits=4):
+    """Mean color of the most populated cell of a coarse RGB histogram, as #rrggbb"""
+    import numpy as np
+
+    flat = pixels.reshape(-1, 3).astype(np.int64)
+    shift = 8 - bits
+    cells = ((flat[:, 0] >> shift) << (2 * bits)) | ((flat[:, 1] >> shift) << bits) | (flat[:, 2] >> shift)
+    winner = np.bincount(cells).argmax()
+    r, g, b = np.rint(flat[cells == winner].mean(axis=0)).astype(int)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def compute_placeholder(path):
+    """Placeholder fields for one image (runs in a worker process)"""
+    import numpy as np
+    from PIL import Image, features
+
+    with Image.open(path) as img:
+        # draft() shrinks JPEG decodes, so the original dimensions are read first
+        width, height = img.size
+        img.draft('RGB', (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+        rgba = img.convert('RGBA')
+        rgba.thumbnail((SAMPLE_SIZE * 4, SAMPLE_SIZE * 4), Image.BOX)
+
+    # Transparent areas show the white gallery background
+    sample = Image.new('RGB', rgba.size, (255, 255, 255))
+    sample.paste(rgba, mask=rgba.getchannel('A'))
+
+    small = sample.copy()
+    small.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.LANCZOS)
+    pixels = np.asarray(small)
+
+    preview = sample.copy()
+    preview.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.LANCZOS)
+    buffer = io.BytesIO()
+    if features.check('webp'):
+        preview.save(buffer, 'WEBP', quality=PREVIEW_QUALITY, method=6)
+        mime = 'image/webp'
+    else:
+        preview.save(buffer, 'JPEG', quality=PREVIEW_QUALITY, optimize=True)
+        mime = 'image/jpeg'
+
+    landscape = width >= height
+    return {
+        'width': width,
+        'height': height,
+        'color': dominant_color(pixels),
+        'blurhash': blurhash_encode(pixels, 4 if landscape else 3, 3 if landscape else 4),
+        'data_uri': f"data:{mime};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+    }
+
+
+class PlaceholderBuilder:
+    def __init__(self, extractor=None, cache=None):
+        self.extractor = extractor or ImageMetadataExtractor(verbose=False)
+        self.cache = cache
+        self.computed = 0
+        self.cached = 0
+
+    def source_path(self, artwork_id):
+        """The thumbnail is already small, so it is decoded in preference to the large image"""
+        image_paths = self.extractor.get_local_image_paths(artwork_id)
+        if image_paths:
+            return image_paths['thumb_path'] or image_paths['large_path']
+        thumb_path = os.path.join("images/paintings/thumbnails", f"{artwork_id}_thumb.png")
+        return thumb_path if os.path.exists(thumb_path) else None
+
+    def build(self, artwork_ids, workers=None):
+        """{artwork_id: placeholder} in input order for every artwork with an image"""
+        placeholders = {}
+        jobs = []
+        for artwork_id in artwork_ids:
+            path = self.source_path(artwork_id)
+            if not path:
+                continue
+            cached = self.cache.get(artwork_id, path) if self.cache else None
+            # Keep output order equal to input order, filled in below
+            placeholders[artwork_id] = cached
+            if cached:
+                self.cached += 1
+            else:
+                jobs.append((artwork_id, path))
+
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for (artwork_id, path), placeholder in zip(jobs, executor.map(compute_placeholder,
+                                                                             [path for _, path in jobs],
+                                                                             chunksize=8)):
+                    placeholders[artwork_id] = placeholder
+                    if self.cache:
+                        self.cache.put(artwork_id, path, placeholder)
+            self.computed += len(jobs)
+            if self.cache:
+                self.cache.save()
+        return placeholders
+
+
+def load_placeholders(path=DEFAULT_OUTPUT):
+    """Placeholders written by this script, or {} if it has not been run"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    """Compute placeholders for every artwork with a thumbnail or large image"""
+    parser = argparse.ArgumentParser(description="Compute BlurHash / dominant color / tiny preview placeholders")
+    parser.add_argument("--artworks", default="data/artworks.json")
+    parser.add_argument("--output", default="data/placeholders.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", default="placeholder_cache.jsonl")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cache and recompute everything")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.artworks):
+        print(f"❌ File not found: {args.artworks}")
+        return
+
+    builder = PlaceholderBuilder(cache=MetadataCache(args.cache, rebuild=args.rebuild))
+    artwork_ids = [artwork['id'] for artwork in iter_json_array(args.artworks)]
+    placeholders = builder.build(artwork_ids, workers=args.workers)
+
+    tmp_file = f"{args.output}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(placeholders, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, args.output)
+
+    uri_bytes = sum(len(placeholder['data_uri']) for placeholder in placeholders.values())
+    print(f"✅ Placeholders complete!")
+    print(f"   • Artworks: {len(placeholders)} ({builder.computed} computed, {builder.cached} from cache)")
+    print(f"   • Without any image: {len(artwork_ids) - len(placeholders)}")
+    if placeholders:
+        print(f"   • Average preview data URI: {uri_bytes / len(placeholders):.0f} bytes")
+    print(f"💾 Placeholders saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Lossless PNG optimizer for the painting images
+Re-encodes each PNG in a process pool: lossless color-type reductions (opaque
+RGBA → RGB, gray RGB → L, ≤256 colors → palette), then scanline filters
+computed in NumPy, ranked by a fast trial compression, with every zlib strategy
+tried at level 9 on the best few. A candidate replaces the original only if it
+is smaller and decodes to identical pixels.
+Results are cached so unchanged files are skipped, and the file sizes in the
+FinerWorks-ready file can be patched afterwards
+
+    python data/png_optimizer.py --metadata finerworks_ready_artworks.json
+"""
+
+import argparse
+import json
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from metadata_cache import MetadataCache
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Ancillary chunks that affect how pixels are displayed; text and time chunks are dropped
+KEEP_CHUNKS = (b'iCCP', b'sRGB', b'gAMA', b'cHRM', b'pHYs')
+
+FILTERS = ('adaptive', 0, 1, 2, 3, 4)
+STRATEGIES = {
+    'default': zlib.Z_DEFAULT_STRATEGY,
+    'filtered': zlib.Z_FILTERED,
+    'rle': zlib.Z_RLE,
+}
+
+# zlib level used to rank filters before the full search
+TRIAL_LEVEL = 3
+DEFAULT_SHORTLIST = 2
+
+# PNG color type and channel count per working mode
+COLOR_TYPES = {'L': (0, 1), 'RGB': (2, 3), 'P': (3, 1), 'LA': (4, 2), 'RGBA': (6, 4)}
+
+
+def read_chunks(data):
+    """[(type, body), ...] of a PNG file"""
+    chunks = []
+    offset = len(PNG_SIGNATURE)
+    while offset < len(data):
+        length, chunk_type = struct.unpack('>I4s', data[offset:offset + 8])
+        chunks.append((chunk_type, data[offset + 8:offset + 8 + length]))
+        offset += 12 + length
+    return chunks
+
+
+def _chunk(chunk_type, body):
+    return struct.pack('>I', len(body)) + chunk_type + body + struct.pack('>I', zlib.crc32(chunk_type + body))
+
+
+def filter_scanlines(pixels, bpp, method):
+    """Filtered scanlines (filter byte + data per row) for a fixed filter or per-row adaptive choice"""
+    import numpy as np
+
+    raw = pixels.reshape(pixels.shape[0], -1).astype(np.int16)
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    up = np.zeros_like(raw)
+    up[1:] = raw[:-1]
+    upper_left = np.zeros_like(raw)
+    upper_left[1:, bpp:] = raw[:-1, :-bpp]
+
+    def paeth():
+        estimate = left + up - upper_left
+        pa = np.abs(estimate - left)
+        pb = np.abs(estimate - up)
+        pc = np.abs(estimate - upper_left)
+        return np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left))
+
+    predictors = {
+        0: lambda: 0,
+        1: lambda: left,
+        2: lambda: up,
+        3: lambda: (left + up) >> 1,
+        4: paeth,
+    }
+
+    if method != 'adaptive':
+        filtered = ((raw - predictors[method]()) & 0xFF).astype(np.uint8)
+        types = np.full((raw.shape[0], 1), method, dtype=np.uint8)
+        return np.hstack([types, filtered]).tobytes()
+
+    # Minimum sum of absolute differences heuristic (libpng's default), per row
+    candidates = np.stack([((raw - predictors[m]()) & 0xFF).astype(np.uint8) for m in range(5)])
+    cost = np.abs(candidates.astype(np.int8).astype(np.int16)).sum(axis=2)
+    best = cost.argmin(axis=0)
+    filtered = candidates[best, np.arange(raw.shape[0])]
+    return np.hstack([best.astype(np.uint8)[:, None], filtered]).tobytes()
+
+
+def reduce_image(img, keep_color_space):
+    """Smallest lossless working mode for img, returns (mode, pixels, palette, transparency)"""
+    import numpy as np
+
+    rgba = np.asarray(img.convert('RGBA'))
+    opaque = bool((rgba[..., 3] == 255).all())
+    gray = bool(((rgba[..., 0] == rgba[..., 1]) & (rgba[..., 1] == rgba[..., 2])).all())
+
+    packed = rgba.view('>u4').reshape(rgba.shape[:2])
+    colors, inverse = np.unique(packed, return_inverse=True)
+    if len(colors) <= 256:
+        palette_rgba = colors.astype('>u4').view(np.uint8).reshape(-1, 4)
+        palette = palette_rgba[:, :3].tobytes()
+        transparency = None
+        if not opaque:
+            alpha = palette_rgba[:, 3]
+            # tRNS only needs entries up to the last non-opaque color
+            transparency = alpha[:np.flatnonzero(alpha != 255).max() + 1].tobytes()
+        return 'P', inverse.reshape(rgba.shape[:2]).astype(np.uint8), palette, transparency
+
+    if gray and not keep_color_space:
+        return ('L', rgba[..., 0], None, None) if opaque else ('LA', rgba[..., [0, 3]], None, None)
+    return ('RGB', rgba[..., :3], None, None) if opaque else ('RGBA', rgba, None, None)
+
+
+def encode_png(mode, pixels, palette, transparency, extra_chunks, filter_method, strategy, level=9):
+    color_type, channels = COLOR_TYPES[mode]
+    height, width = pixels.shape[:2]
+    scanlines = filter_scanlines(pixels, channels, filter_method)
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+    idat = compressor.compress(scanlines) + compressor.flush()
+
+    parts = [PNG_SIGNATURE, _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))]
+    # Color chunks must precede PLTE and IDAT
+    parts.extend(_chunk(chunk_type, body) for chunk_type, body in extra_chunks)
+    if palette is not None:
+        parts.append(_chunk(b'PLTE', palette))
+    if transparency:
+        parts.append(_chunk(b'tRNS', transparency))
+    parts.append(_chunk(b'IDAT', idat))
+    parts.append(_chunk(b'IEND', b''))
+    return b''.join(parts)
+
+
+def same_pixels(original, candidate_bytes):
+    import io
+
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(io.BytesIO(candidate_bytes)) as candidate:
+        return np.array_equal(np.asarray(original.convert('RGBA')), np.asarray(candidate.convert('RGBA')))
+
+
+def optimize_png(job):
+    """Try every encoding of one PNG and keep the smallest identical one (runs in a worker process)"""
+    from PIL import Image
+
+    path, filters, strategies, shortlist, dry_run = job
+    with open(path, 'rb') as f:
+        original_bytes = f.read()
+
+    result = {'path': path, 'original_bytes': len(original_bytes), 'optimized_bytes': len(original_bytes),
+              'mode': None, 'filter': None, 'strategy': None}
+
+    with Image.open(path) as img:
+        img.load()
+        if img.format != 'PNG' or img.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+            # 16-bit and other exotic modes are left alone rather than risk a lossy conversion
+            result['skipped'] = f"mode {img.mode}"
+            return result
+
+        extra_chunks = [(chunk_type, body) for chunk_type, body in read_chunks(original_bytes)
+                        if chunk_type in KEEP_CHUNKS]
+        # An RGB ICC profile is invalid on a grayscale image
+        keep_color_space = img.mode not in ('1', 'L', 'LA') and any(
+            chunk_type == b'iCCP' for chunk_type, _ in extra_chunks)
+        mode, pixels, palette, transparency = reduce_image(img, keep_color_space)
+
+        # Palette indices are not continuous values, filtering rarely helps them
+        if mode == 'P':
+            filters = [method for method in filters if method in (0, 'adaptive')] or filters
+        # Rank filters with a fast compression, then search strategies at level 9 on the best few
+        if len(filters) > shortlist:
+            trial_sizes = {method: len(encode_png(mode, pixels, palette, transparency, extra_chunks,
+                                                  method, zlib.Z_DEFAULT_STRATEGY, level=TRIAL_LEVEL))
+                           for method in filters}
+            filters = sorted(filters, key=trial_sizes.__getitem__)[:shortlist]
+
+        best = None
+        for filter_method in filters:
+            for strategy_name in strategies:
+                candidate = encode_png(mode, pixels, palette, transparency, extra_chunks,
+                                       filter_method, STRATEGIES[strategy_name])
+                if best is None or len(candidate) < len(best[0]):
+                    best = (candidate, filter_method, strategy_name)
+
+        if best is None or len(best[0]) >= len(original_bytes) or not same_pixels(img, best[0]):
+            return result
+
+    data, filter_method, strategy_name = best
+    result.update(optimized_bytes=len(data), mode=mode, filter=filter_method, strategy=strategy_name)
+    if not dry_run:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return result
+
+
+class PngOptimizer:
+    def __init__(self, directories=("images/paintings/large", "images/paintings/thumbnails"),
+                 filters=FILTERS, strategies=tuple(STRATEGIES), shortlist=DEFAULT_SHORTLIST, cache=None,
+                 dry_run=False):
+        self.directories = directories
+        self.filters = tuple(filters)
+        self.strategies = tuple(strategies)
+        self.shortlist = shortlist
+        self.cache = cache
+        self.dry_run = dry_run
+
+    def settings(self):
+        """Anything that changes the search invalidates cached results"""
+        return {'filters': [str(method) for method in self.filters], 'strategies': list(self.strategies),
+                'shortlist': self.shortlist}
+
+    def iter_paths(self):
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                if filename.lower().endswith('.png'):
+                    yield os.path.join(directory, filename)
+
+    def run(self, workers=None):
+        """Optimize every PNG the cache does not vouch for, returns (results, skipped_count)"""
+        jobs = []
+        skipped = 0
+        for path in self.iter_paths():
+            cached = self.cache.get(path, path) if self.cache else None
+            if cached and cached.get('settings') == self.settings():
+                skipped += 1
+            else:
+                jobs.append((path, self.filters, self.strategies, self.shortlist, self.dry_run))
+
+        results = []
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for result in executor.map(optimize_png, jobs):
+                    results.append(result)
+                    saved = result['original_bytes'] - result['optimized_bytes']
+                    if saved:
+                        print(f"  🗜️  {os.path.basename(result['path'])}: "
+                              f"{result['original_bytes'] / 1024:.0f} → {result['optimized_bytes'] / 1024:.0f} KB "
+                              f"({result['mode']}, filter {result['filter']}, {result['strategy']})")
+                    if self.cache and not self.dry_run:
+                        self.cache.put(result['path'], result['path'], dict(result, settings=self.settings()))
+            if self.cache and not self.dry_run:
+                self.cache.save()
+        return results, skipped
+
+
+def update_file_sizes(metadata_file, results):
+    """Patch file_size/file_size_mb of re-encoded large images in a FinerWorks-ready file"""
+    sizes = {os.path.basename(result['path']): result['optimized_bytes']
+             for result in results if result['optimized_bytes'] < result['original_bytes']}
+    if not sizes:
+        return 0
+
+    with open(metadata_file, 'r', encoding='utf-8') as f:
+        artworks = json.load(f)
+
+    updated = 0
+    for artwork_data in artworks.values():
+        metadata = artwork_data.get('finerworks_image')
+        if not metadata:
+            continue
+        api_object = metadata['finerworks_api_object']
+        new_size = sizes.get(api_object['file_name'])
+        if new_size is not None and api_object['file_size'] != new_size:
+            api_object['file_size'] = new_size
+            metadata['file_size_mb'] = round(new_size / (1024 * 1024), 2)
+            updated += 1
+
+    if updated:
+        tmp_file = f"{metadata_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(artworks, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, metadata_file)
+    return updated
+
+
+def main():
+    """Losslessly recompress the painting PNGs in place"""
+    parser = argparse.ArgumentParser(description="Lossless PNG optimization for the image library")
+    parser.add_argument("directories", nargs="*", default=["images/paintings/large", "images/paintings/thumbnails"])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--filters", default=",".join(map(str, FILTERS)),
+                        help="scanline filters to try: adaptive,0-4 (default: all)")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help=f"zlib strategies to try (default: {','.join(STRATEGIES)})")
+    parser.add_argument("--shortlist", type=int, default=DEFAULT_SHORTLIST,
+                        help="filters kept after the fast ranking pass; 6 tries every combination "
+                             f"(default: {DEFAULT_SHORTLIST})")
+    parser.add_argument("--cache", default="png_optimizer_cache.jsonl")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cache and retry every file")
+    parser.add_argument("--dry-run", action="store_true", help="report savings without rewriting files")
+    parser.add_argument("--metadata", default=None, metavar="READY_JSON",
+                        help="FinerWorks-ready file whose file_size values are updated")
+    args = parser.parse_args()
+
+    optimizer = PngOptimizer(
+        directories=args.directories,
+        filters=[method if method == 'adaptive' else int(method) for method in args.filters.split(',')],
+        strategies=[name.strip() for name in args.strategies.split(',')],
+        shortlist=max(1, args.shortlist),
+        cache=MetadataCache(args.cache, rebuild=args.rebuild),
+        dry_run=args.dry_run
+    )
+
+    print(f"🗜️  Optimizing PNGs in: {', '.join(args.directories)}")
+    print("-" * 60)
+    results, skipped = optimizer.run(workers=args.workers)
+
+    original = sum(result['original_bytes'] for result in results)
+    optimized = sum(result['optimized_bytes'] for result in results)
+    improved = sum(1 for result in results if result['optimized_bytes'] < result['original_bytes'])
+
+    print(f"\n" + "="*60)
+    print(f"✅ PNG optimization {'dry run ' if args.dry_run else ''}complete!")
+    print(f"   • Processed: {len(results)} files ({improved} smaller)")
+    print(f"   • Unchanged (skipped): {skipped} files")
+    if original:
+        print(f"   • Size: {original / (1024 * 1024):.1f} → {optimized / (1024 * 1024):.1f} MB "
+              f"({(1 - optimized / original) * 100:.1f}% saved)")
+    if args.metadata and not args.dry_run:
+        if os.path.exists(args.metadata):
+            updated = update_file_sizes(args.metadata, results)
+            print(f"💾 Updated file_size of {updated} artworks in {args.metadata}")
+        else:
+            print(f"❌ File not found: {args.metadata}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+標準印刷尺寸索引
+將 Finerworks 提供的標準尺寸依長寬比排序，以二分搜尋找出最接近畫作比例的尺寸，
+建立好的索引以 pickle 快取，來源表未變更時直接載入
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from bisect import bisect_left
+
+DEFAULT_SIZES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'finerworks_standard_sizes.json')
+
+
+class StandardSizeIndex:
+    def __init__(self, sizes):
+        """由 [(width, height), ...] 建立索引，直向與橫向皆收錄"""
+        groups = {}
+        for width, height in sizes:
+            for w, h in {(width, height), (height, width)}:
+                groups.setdefault(w / h, set()).add((w, h))
+
+        # 依比例排序；同比例的尺寸依長邊由小到大排列
+        self.ratios = sorted(groups)
+        self.groups = [sorted(groups[ratio], key=lambda size: max(size)) for ratio in self.ratios]
+
+    def __len__(self):
+        return sum(len(group) for group in self.groups)
+
+    def nearest(self, ratio, min_long=0, max_long=float('inf'), limit=None, tolerance=0.1):
+        """返回最接近 ratio 的尺寸 [(width, height, ratio_error), ...]
+
+        從二分搜尋的位置向兩側展開，只走訪相對比例誤差在 tolerance 內的組別；
+        limit 為 None 時返回 tolerance 內的全部尺寸
+        """
+        results = []
+        hi = bisect_left(self.ratios, ratio)
+        lo = hi - 1
+        limit = float('inf') if limit is None else limit
+
+        while len(results) < limit:
+            lo_error = abs(self.ratios[lo] / ratio - 1) if lo >= 0 else float('inf')
+            hi_error = abs(self.ratios[hi] / ratio - 1) if hi < len(self.ratios) else float('inf')
+            if min(lo_error, hi_error) > tolerance:
+                break
+
+            if lo_error <= hi_error:
+                group, error = self.groups[lo], lo_error
+                lo -= 1
+            else:
+                group, error = self.groups[hi], hi_error
+                hi += 1
+
+            for width, height in group:
+                if min_long <= max(width, height) <= max_long:
+                    results.append((width, height, error))
+                    if len(results) >= limit:
+                        break
+
+        return results
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_SIZES_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['sizes'])
+
+
+def load_size_index(path=DEFAULT_SIZES_FILE, cache_file=None):
+    """載入索引；cache_file 存在且來源表內容相同時不重新建立"""
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_digest, index = pickle.load(f)
+            if cached_digest == digest:
+                return index
+        except (pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            # 損壞或舊版的快取直接重建
+            pass
+
+    index = StandardSizeIndex.from_file(path)
+    if cache_file:
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((digest, index), f)
+        os.replace(tmp_file, cache_file)
+    return index
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Responsive derivative generator for the gallery
+Builds properly sized WebP/AVIF/JPEG renditions of each painting at several widths
+(from the large image, or the thumbnail when there is none), with content-hashed
+file names, and writes a srcset manifest for the front end
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+from json_stream import iter_json_array
+from metadata_cache import MetadataCache
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+DEFAULT_FORMATS = ('webp', 'avif', 'jpeg')
+
+# Pillow format name, file extension and encoder options per output format
+FORMAT_OPTIONS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 6}),
+    'avif': ('AVIF', 'avif', {'quality': 60}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def available_formats(formats):
+    """Drop formats the installed Pillow cannot encode (AVIF needs a recent build)"""
+    from PIL import features
+
+    return [fmt for fmt in formats if features.check(fmt if fmt != 'jpeg' else 'jpg')]
+
+
+def _write_if_missing(path, data):
+    """Content-hashed names never change content, so an existing file is already correct"""
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_derivatives(job):
+    """Render every width × format for one source image (runs in a worker process)"""
+    from PIL import Image
+
+    artwork_id, source_path, output_dir, url_prefix, widths, formats = job
+
+    with Image.open(source_path) as img:
+        img.load()
+        source_w, source_h = img.size
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        rgba = img.convert('RGBA' if has_alpha else 'RGB')
+
+    entry = {'pix_w': source_w, 'pix_h': source_h, 'variants': {fmt: [] for fmt in formats}}
+
+    # Never upscale; a source narrower than every width still gets one rendition
+    targets = sorted({min(width, source_w) for width in widths}, reverse=True)
+    for width in targets:
+        height = max(1, round(source_h * width / source_w))
+        resized = rgba if width == source_w else rgba.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+        for fmt in formats:
+            pil_format, extension, options = FORMAT_OPTIONS[fmt]
+            frame = resized
+            if pil_format == 'JPEG' and frame.mode == 'RGBA':
+                # JPEG has no alpha, flatten onto white like the gallery background
+                background = Image.new('RGB', frame.size, (255, 255, 255))
+                background.paste(frame, mask=frame.getchannel('A'))
+                frame = background
+
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, **options)
+            data = buffer.getvalue()
+
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            filename = f"{artwork_id}_{width}w.{digest}.{extension}"
+            _write_if_missing(os.path.join(output_dir, filename), data)
+
+            entry['variants'][fmt].append({
+                'url': f"{url_prefix}{filename}",
+                'width': width,
+                'height': height,
+                'bytes': len(data)
+            })
+
+    for fmt, variants in entry['variants'].items():
+        variants.sort(key=lambda variant: variant['width'])
+    entry['srcset'] = {
+        fmt: ', '.join(f"{variant['url']} {variant['width']}w" for variant in variants)
+        for fmt, variants in entry['variants'].items()
+    }
+    return artwork_id, entry
+
+
+class ResponsiveImageBuilder:
+    def __init__(self, extractor=None, output_dir="images/paintings/responsive",
+                 url_prefix="./images/paintings/responsive/", widths=DEFAULT_WIDTHS,
+                 formats=DEFAULT_FORMATS, cache=None, thumb_dir="images/paintings/thumbnails"):
+        self.extractor = extractor or ImageMetadataExtractor()
+        self.thumb_dir = thumb_dir
+        self.output_dir = output_dir
+        self.url_prefix = url_prefix
+        self.widths = tuple(sorted(widths))
+        self.formats = tuple(available_formats(formats))
+        self.cache = cache
+
+    def settings(self):
+        """Anything that changes the rendered files invalidates cached entries"""
+        return {'widths': list(self.widths), 'formats': list(self.formats),
+                'options': {fmt: FORMAT_OPTIONS[fmt][2] for fmt in self.formats}}
+
+    def source_path(self, artwork_id):
+        """(path, 'large' or 'thumb') of the image to render from, or (None, None)
+
+        Most artworks only have a thumbnail; it is used as the source then, and
+        since nothing is upscaled their renditions stop at the thumbnail's width
+        """
+        image_paths = self.extractor.get_local_image_paths(artwork_id)
+        if image_paths:
+            return image_paths['large_path'], 'large'
+        thumb_path = os.path.join(self.thumb_dir, f"{artwork_id}_thumb.png")
+        if os.path.exists(thumb_path):
+            return thumb_path, 'thumb'
+        return None, None
+
+    def _cached_entry(self, artwork_id, source_path):
+        """Reuse a previous build if the source, the settings and every output file are unchanged"""
+        if not self.cache:
+            return None
+        cached = self.cache.get(artwork_id, source_path)
+        if not cached or cached.get('settings') != self.settings():
+            return None
+        for variants in cached['entry']['variants'].values():
+            for variant in variants:
+                filename = variant['url'][len(self.url_prefix):]
+                if not os.path.exists(os.path.join(self.output_dir, filename)):
+                    return None
+        return cached['entry']
+
+    def build(self, artwork_ids, workers=None):
+        """Build derivatives for artwork_ids, returns (manifest, built_count, skipped_count)"""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        manifest = {}
+        jobs = []
+        sources = {}
+        source_kinds = {}
+        skipped = 0
+        for artwork_id in artwork_ids:
+            source_path, source_kind = self.source_path(artwork_id)
+            if not source_path:
+                continue
+            source_kinds[artwork_id] = source_kind
+            entry = self._cached_entry(artwork_id, source_path)
+            # Keep manifest order equal to input order, filled in below
+            manifest[artwork_id] = entry
+            if entry is None:
+                sources[artwork_id] = source_path
+                jobs.append((artwork_id, source_path, self.output_dir, self.url_prefix,
+                             self.widths, self.formats))
+            else:
+                skipped += 1
+
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for artwork_id, entry in executor.map(build_derivatives, jobs):
+                    manifest[artwork_id] = entry
+                    print(f"  🖼️  {artwork_id}: {sum(len(v) for v in entry['variants'].values())} files")
+                    if self.cache:
+                        self.cache.put(artwork_id, sources[artwork_id],
+                                       {'settings': self.settings(), 'entry': entry})
+
+        if self.cache:
+            self.cache.save()
+
+        # Lets the front end tell renditions capped at thumbnail width apart
+        for artwork_id, source_kind in source_kinds.items():
+            manifest[artwork_id]['source'] = source_kind
+
+        return manifest, len(jobs), skipped
+
+    def save_manifest(self, manifest, output_file):
+        """Write the id → srcset manifest"""
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, output_file)
+
+
+def main():
+    """Build responsive renditions for every artwork with a large image or a thumbnail"""
+    parser = argparse.ArgumentParser(description="Build responsive gallery images")
+    parser.add_argument("--artworks", default="data/artworks.json")
+    parser.add_argument("--manifest", default="data/responsive_images.json")
+    parser.add_argument("--output-dir", default="images/paintings/responsive")
+    parser.add_argument("--widths", default=",".join(map(str, DEFAULT_WIDTHS)),
+                        help="comma separated widths (default: 320,640,1280)")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS),
+                        help="comma separated formats (default: webp,avif,jpeg)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", default="responsive_image_cache.jsonl")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="ignore the cache and re-render every image")
+    args = parser.parse_args()
+
+    builder = ResponsiveImageBuilder(
+        output_dir=args.output_dir,
+        widths=[int(width) for width in args.widths.split(',')],
+        formats=[fmt.strip().lower() for fmt in args.formats.split(',')],
+        cache=MetadataCache(args.cache, rebuild=args.rebuild)
+    )
+
+    print(f"🎨 Building responsive images into: {args.output_dir}")
+    print(f"📐 Widths: {', '.join(map(str, builder.widths))}  Formats: {', '.join(builder.formats)}")
+    print("-" * 60)
+
+    artwork_ids = [artwork['id'] for artwork in iter_json_array(args.artworks)]
+    manifest, built, skipped = builder.build(artwork_ids, workers=args.workers)
+    builder.save_manifest(manifest, args.manifest)
+
+    total_bytes = sum(
+        variant['bytes'] for entry in manifest.values()
+        for variants in entry['variants'].values() for variant in variants
+    )
+    print(f"\n" + "="*60)
+    print(f"✅ Responsive images complete!")
+    print(f"   • Built: {built} artworks")
+    print(f"   • Unchanged (skipped): {skipped} artworks")
+    print(f"   • From thumbnail only: {sum(entry['source'] == 'thumb' for entry in manifest.values())} artworks")
+    print(f"   • Without any image: {len(artwork_ids) - len(manifest)} artworks")
+    print(f"   • Total size: {total_bytes / (1024 * 1024):.2f} MB")
+    print(f"💾 Manifest saved as: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
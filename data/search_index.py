@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Prebuilt search index for the gallery
+Inverted index over title/titleEn/description/descriptionEn: Chinese text is
+indexed as single characters plus character bigrams, English as lightly stemmed
+words. Posting lists hold catalog row numbers, delta-encoded in the JSON output.
+A sidecar cache keeps each record's terms so rebuilds only re-tokenize records
+whose text changed
+
+    python data/search_index.py
+    python data/search_index.py --query "梅花 moon"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+
+from optimal_size_calculator_fixed import load_artworks
+
+SEARCH_FIELDS = ('title', 'titleEn', 'description', 'descriptionEn')
+
+# CJK ideographs (BMP, compatibility and the supplementary planes) versus latin words
+TOKEN_RE = re.compile(r'([㐀-䶿一-鿿豈-﫿\U00020000-\U0003134f]+)|([a-z0-9]+)')
+
+STOP_WORDS = frozenset('a an and are as at be by for from in into is it of on or the to with'.split())
+
+
+def stem(word):
+    """Light English suffix stripping so plurals, verb forms and a final "e" share a term"""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith(('ches', 'shes', 'xes', 'zes', 'sses')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    else:
+        for suffix in ('ing', 'ed'):
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                # Undouble the consonant left behind (running → runn → run)
+                if word[-1] == word[-2] and word[-1] not in 'aeiouls':
+                    word = word[:-1]
+                break
+    # dance / dancing / dances all end up as "danc"
+    if word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Index terms of one text: CJK unigrams and bigrams, stemmed English words"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    terms = []
+    for cjk, word in TOKEN_RE.findall(text):
+        if cjk:
+            terms.extend(cjk)
+            terms.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        elif word not in STOP_WORDS:
+            terms.append(stem(word))
+    return terms
+
+
+def query_terms(query):
+    """Terms a query must match; CJK runs use bigrams only since they imply the unigrams"""
+    text = unicodedata.normalize('NFKC', query or '').lower()
+    terms = []
+    for cjk, word in TOKEN_RE.findall(text):
+        if cjk:
+            terms.extend([cjk] if len(cjk) == 1 else (cjk[i:i + 2] for i in range(len(cjk) - 1)))
+        elif word not in STOP_WORDS:
+            terms.append(stem(word))
+    return list(dict.fromkeys(terms))
+
+
+def record_terms(artwork):
+    terms = set()
+    for field in SEARCH_FIELDS:
+        terms.update(tokenize(artwork.get(field)))
+    return sorted(terms)
+
+
+def record_digest(artwork):
+    text = '\x1f'.join(artwork.get(field) or '' for field in SEARCH_FIELDS)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _delta_encode(rows):
+    previous = 0
+    encoded = []
+    for row in rows:
+        encoded.append(row - previous)
+        previous = row
+    return encoded
+
+
+def _delta_decode(deltas):
+    rows = []
+    total = 0
+    for delta in deltas:
+        total += delta
+        rows.append(total)
+    return rows
+
+
+class SearchIndex:
+    def __init__(self, ids, postings):
+        self.ids = ids
+        self.postings = postings  # term → sorted list of rows
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query):
+        """Rows matching every query term, cost proportional to the shortest posting lists"""
+        terms = query_terms(query)
+        if not terms:
+            return []
+        lists = sorted((self.postings.get(term, ()) for term in terms), key=len)
+        if len(lists) == 1:
+            return list(lists[0])
+        result = set(lists[0])
+        for rows in lists[1:]:
+            if not result:
+                break
+            result.intersection_update(rows)
+        return sorted(result)
+
+    def search_ids(self, query):
+        return [self.ids[row] for row in self.search(query)]
+
+    def to_dict(self):
+        return {
+            'version': 1,
+            'fields': list(SEARCH_FIELDS),
+            'ids': self.ids,
+            'postings': {term: _delta_encode(rows) for term, rows in sorted(self.postings.items())}
+        }
+
+    def save(self, output_file):
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, output_file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['ids'], {term: _delta_decode(deltas) for term, deltas in data['postings'].items()})
+
+
+class SearchIndexBuilder:
+    """Builds a SearchIndex, reusing cached terms of records whose text is unchanged"""
+
+    def __init__(self, cache_file=None, rebuild=False):
+        self.cache_file = cache_file
+        self.entries = {}
+        self.tokenized = 0
+        self.reused = 0
+        if cache_file and not rebuild and os.path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry['id']] = entry
+                    except (ValueError, KeyError):
+                        # A truncated last line from an interrupted run just becomes a miss
+                        continue
+
+    def terms_for(self, artwork):
+        digest = record_digest(artwork)
+        entry = self.entries.get(artwork['id'])
+        if entry is not None and entry['digest'] == digest:
+            self.reused += 1
+            return entry['terms']
+        self.tokenized += 1
+        terms = record_terms(artwork)
+        self.entries[artwork['id']] = {'id': artwork['id'], 'digest': digest, 'terms': terms}
+        return terms
+
+    def build(self, artworks):
+        ids = []
+        postings = {}
+        for row, artwork in enumerate(artworks):
+            ids.append(artwork['id'])
+            for term in self.terms_for(artwork):
+                postings.setdefault(term, []).append(row)
+
+        # Records that left the catalog drop out of the cache
+        current = set(ids)
+        self.entries = {artwork_id: entry for artwork_id, entry in self.entries.items() if artwork_id in current}
+        return SearchIndex(ids, postings)
+
+    def save(self):
+        if not self.cache_file:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for artwork_id in sorted(self.entries):
+                f.write(json.dumps(self.entries[artwork_id], ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.cache_file)
+
+
+def main():
+    """Build data/search_index.json, or query it"""
+    parser = argparse.ArgumentParser(description="Build or query the gallery search index")
+    parser.add_argument("--artworks", default="data/artworks.json",
+                        help="artworks JSON array or a .momcat store built by catalog_store.py")
+    parser.add_argument("--output", default="data/search_index.json")
+    parser.add_argument("--cache", default="search_index_cache.jsonl",
+                        help="per-record terms reused by incremental builds")
+    parser.add_argument("--rebuild", action="store_true", help="re-tokenize every record")
+    parser.add_argument("--query", default=None, help="search the existing index instead of building")
+    args = parser.parse_args()
+
+    if args.query is not None:
+        index = SearchIndex.load(args.output)
+        start = time.perf_counter()
+        ids = index.search_ids(args.query)
+        elapsed = time.perf_counter() - start
+        print(f"🔍 {len(ids)} matches for {args.query!r} in {elapsed * 1e6:.0f} µs")
+        for artwork_id in ids[:20]:
+            print(f"   • {artwork_id}")
+        return
+
+    if not os.path.exists(args.artworks):
+        print(f"❌ File not found: {args.artworks}")
+        return
+
+    builder = SearchIndexBuilder(args.cache, rebuild=args.rebuild)
+    start = time.perf_counter()
+    index = builder.build(load_artworks(args.artworks, fields=('id',) + SEARCH_FIELDS))
+    index.save(args.output)
+    builder.save()
+
+    print(f"✅ Search index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"   • Records: {len(index)} ({builder.tokenized} tokenized, {builder.reused} unchanged)")
+    print(f"   • Terms: {len(index.postings)}")
+    print(f"   • Size: {os.path.getsize(args.output) / 1024:.1f} KB")
+    print(f"💾 Index saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
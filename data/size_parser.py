@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+sizeCm 尺寸字串解析器
+單一預編譯正則表達式，支援 ×/x/X/＊ 分隔、全形數字、小數、單位與範圍，
+重複出現的尺寸字串由快取直接返回
+"""
+
+import argparse
+import json
+import re
+import time
+import unicodedata
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+
+class SizeCm(NamedTuple):
+    """解析結果 (公分)，無法解析時兩者皆為 None"""
+    height: Optional[float]
+    width: Optional[float]
+
+
+UNKNOWN_SIZE = SizeCm(None, None)
+
+# 轉換為公分的倍數
+UNIT_SCALE = {
+    '': 1.0, 'cm': 1.0, '公分': 1.0, '厘米': 1.0, '釐米': 1.0,
+    'mm': 0.1, '毫米': 0.1,
+    'in': 2.54, 'inch': 2.54, 'inches': 2.54, '"': 2.54, '吋': 2.54,
+}
+
+_NUMBER = r'\d+(?:\.\d+)?'
+_VALUE = rf'({_NUMBER})(?:\s*[-~～–—]\s*({_NUMBER}))?'
+_UNIT = r'\s*(cm|mm|inches|inch|in|"|公分|厘米|釐米|毫米|吋)?'
+
+# 高 × 寬，其後允許附註 (如 "90 × 90(87x95)")
+SIZE_PATTERN = re.compile(
+    rf'^\s*{_VALUE}{_UNIT}\s*[x×*✕]\s*{_VALUE}{_UNIT}',
+    re.IGNORECASE
+)
+
+
+def _value(low, high):
+    """範圍取中間值"""
+    value = float(low)
+    if high is not None:
+        value = (value + float(high)) / 2
+    return value
+
+
+def parse_size_cm(size_str):
+    """解析尺寸字串，返回 SizeCm(height, width)"""
+    # 先排除非字串，list/dict 等不可雜湊的值無法作為快取鍵
+    if not size_str or not isinstance(size_str, str):
+        return UNKNOWN_SIZE
+    return _parse_size_str(size_str)
+
+
+@lru_cache(maxsize=8192)
+def _parse_size_str(size_str):
+    # NFKC 將全形數字、Ｘ、＊ 轉為半形
+    normalized = unicodedata.normalize('NFKC', size_str)
+    match = SIZE_PATTERN.match(normalized)
+    if not match:
+        return UNKNOWN_SIZE
+
+    height_low, height_high, height_unit, width_low, width_high, width_unit = match.groups()
+    # 只標一個單位時 (如 "70 x 135 cm")，兩邊共用
+    height_unit = (height_unit or width_unit or '').lower()
+    width_unit = (width_unit or height_unit).lower()
+
+    height = _value(height_low, height_high) * UNIT_SCALE[height_unit]
+    width = _value(width_low, width_high) * UNIT_SCALE[width_unit]
+    return SizeCm(height, width)
+
+
+# 保留 lru_cache 的介面，供基準測試清除快取
+parse_size_cm.cache_clear = _parse_size_str.cache_clear
+parse_size_cm.cache_info = _parse_size_str.cache_info
+
+
+def benchmark(artworks_file, repeat=20):
+    """解析整個目錄的 sizeCm，報告速度與仍無法解析的記錄"""
+    with open(artworks_file, 'r', encoding='utf-8') as f:
+        artworks = json.load(f)
+
+    sizes = [artwork.get('sizeCm') for artwork in artworks]
+
+    def run(clear_cache):
+        best = None
+        for _ in range(repeat):
+            if clear_cache:
+                parse_size_cm.cache_clear()
+            start = time.perf_counter()
+            for size_str in sizes:
+                parse_size_cm(size_str)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    cold = run(clear_cache=True)
+    warm = run(clear_cache=False)
+
+    print(f"📊 sizeCm 解析: {len(sizes)} 筆記錄，{len(set(sizes))} 種不同字串 (取 {repeat} 次最佳)")
+    print(f"   • 無快取: {cold * 1e6:8.1f} µs  {len(sizes) / cold:12.0f} 筆/秒")
+    print(f"   • 有快取: {warm * 1e6:8.1f} µs  {len(sizes) / warm:12.0f} 筆/秒")
+
+    failures = [artwork for artwork in artworks if parse_size_cm(artwork.get('sizeCm')) == UNKNOWN_SIZE]
+    print(f"\n❓ 仍無法解析: {len(failures)} 筆")
+    for artwork in failures:
+        print(f"   • {artwork.get('id', 'unknown')}  {artwork.get('title', '')}  sizeCm={artwork.get('sizeCm')!r}")
+
+    return failures
+
+
+def main():
+    """sizeCm 解析基準測試與失敗報告"""
+    parser = argparse.ArgumentParser(description="sizeCm 解析基準測試")
+    parser.add_argument("artworks_file", nargs="?", default="data/artworks.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    benchmark(args.artworks_file, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the size recommendations and FinerWorks-ready outputs
+Builds both files once, then watches data/artworks.json and the painting image
+folders (inotify on Linux, stat polling elsewhere). Each change is diffed by
+artwork id and fingerprint, only the affected artworks are recomputed, and the
+outputs are re-assembled from cached per-artwork fragments and swapped in atomically
+
+    python data/watch_artworks.py
+"""
+
+import argparse
+import copy
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import re
+import select
+import struct
+import time
+
+from CreatesJSONforFinerWorksAPI import ImageMetadataExtractor
+from metadata_cache import MetadataCache, file_fingerprint
+from optimal_size_calculator_fixed import OptimalSizeCalculator
+
+IMAGE_PATTERN = re.compile(r'^(?P<id>.+)_(?:large|thumb)\.png$')
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Directory watches through libc's inotify; raises OSError where it is unavailable"""
+
+    def __init__(self, directories):
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, 'inotify_init1'):
+            raise OSError("inotify not available")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for directory in directories:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.directories[wd] = directory
+
+    def _read(self):
+        paths = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return paths
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\x00')
+            offset += length
+            if name and wd in self.directories:
+                paths.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return paths
+
+    def wait(self, timeout=None, debounce=0.05):
+        """Block until something changes, then collect the burst; returns the changed paths"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        paths = self._read()
+        # Editors and git write in several steps; gather them into one update
+        while select.select([self.fd], [], [], debounce)[0]:
+            paths |= self._read()
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Stat-based fallback: compares (size, mtime) snapshots of the watched directories"""
+
+    def __init__(self, directories, interval=0.5):
+        self.directories = list(directories)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            st = entry.stat()
+                            snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def wait(self, timeout=None, debounce=0.05):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(directories, poll=False, interval=0.5):
+    if not poll:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories, interval)
+
+
+def record_fingerprint(artwork):
+    return hashlib.sha1(json.dumps(artwork, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class FragmentFile:
+    """A top-level JSON object kept as one serialized fragment per key
+
+    Output is byte-identical to json.dump(indent=2, ensure_ascii=False), like
+    JsonObjectWriter, but only changed entries are re-serialized on each write
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fragments = {}
+
+    def set(self, key, value):
+        body = json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        self.fragments[key] = f"{json.dumps(key, ensure_ascii=False)}: {body}"
+
+    def write(self, keys):
+        """Atomically write the entries for keys, in that order"""
+        text = '{\n  ' + ',\n  '.join(self.fragments[key] for key in keys) + '\n}' if keys else '{}'
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_file, self.path)
+
+
+class ArtworkWatcher:
+    def __init__(self, artworks_file, recommendations_file, ready_file, extractor, calculator,
+                 thumb_dir="images/paintings/thumbnails"):
+        self.artworks_file = artworks_file
+        self.extractor = extractor
+        self.calculator = calculator
+        self.thumb_dir = thumb_dir
+        self.recommendations_out = FragmentFile(recommendations_file)
+        self.ready_out = FragmentFile(ready_file)
+
+        self.order = []          # artwork ids in catalog order
+        self.fingerprints = {}   # id → record fingerprint
+        self.recommendations = {}
+        self.image_fingerprints = {}
+
+    def directories(self):
+        return [os.path.dirname(os.path.abspath(self.artworks_file)),
+                os.path.abspath(self.extractor.image_dir), os.path.abspath(self.thumb_dir)]
+
+    def _load(self):
+        with open(self.artworks_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _image_fingerprint(self, artwork_id):
+        fingerprint = []
+        for path in (os.path.join(self.extractor.image_dir, f"{artwork_id}_large.png"),
+                     os.path.join(self.thumb_dir, f"{artwork_id}_thumb.png")):
+            try:
+                fingerprint.append(file_fingerprint(path))
+            except FileNotFoundError:
+                fingerprint.append(None)
+        return fingerprint
+
+    def _recompute(self, artwork_id, artwork):
+        """Recalculate sizes and image metadata for one artwork and refresh its fragments"""
+        recommendation = dict(self.calculator.iter_size_recommendations([artwork])).get(artwork_id)
+        if recommendation is None:
+            self.recommendations.pop(artwork_id, None)
+            return
+        self.recommendations[artwork_id] = recommendation
+        self.recommendations_out.set(artwork_id, recommendation)
+        self._reprobe(artwork_id)
+
+    def _reprobe(self, artwork_id):
+        ready = copy.deepcopy(self.recommendations[artwork_id])
+        image_paths, image_info, error = self.extractor.probe_artwork(artwork_id)
+        self.extractor.add_artwork_metadata(artwork_id, ready, image_paths, image_info, error)
+        self.ready_out.set(artwork_id, ready)
+        self.image_fingerprints[artwork_id] = self._image_fingerprint(artwork_id)
+
+    def _write(self):
+        keys = [artwork_id for artwork_id in self.order if artwork_id in self.recommendations]
+        self.recommendations_out.write(keys)
+        self.ready_out.write(keys)
+        if self.extractor.cache:
+            self.extractor.cache.save()
+
+    def build(self):
+        """Full build, as the two batch scripts would produce it"""
+        artworks = self._load()
+        self.order = [artwork['id'] for artwork in artworks]
+        for artwork in artworks:
+            self.fingerprints[artwork['id']] = record_fingerprint(artwork)
+            self._recompute(artwork['id'], artwork)
+        self._write()
+        return len(self.recommendations)
+
+    def update(self, changed_paths):
+        """Apply one batch of file changes, returns (recomputed, reprobed, removed) counts"""
+        artworks_path = os.path.abspath(self.artworks_file)
+        recomputed = reprobed = removed = 0
+
+        if any(os.path.abspath(path) == artworks_path for path in changed_paths):
+            try:
+                artworks = self._load()
+            except (ValueError, FileNotFoundError):
+                # Caught mid-write; the final write triggers another event
+                return 0, 0, 0
+            records = {artwork['id']: artwork for artwork in artworks}
+            for artwork_id in set(self.fingerprints) - set(records):
+                del self.fingerprints[artwork_id]
+                self.recommendations.pop(artwork_id, None)
+                self.image_fingerprints.pop(artwork_id, None)
+                removed += 1
+            for artwork_id, artwork in records.items():
+                fingerprint = record_fingerprint(artwork)
+                if self.fingerprints.get(artwork_id) != fingerprint:
+                    self.fingerprints[artwork_id] = fingerprint
+                    self._recompute(artwork_id, artwork)
+                    recomputed += 1
+            self.order = list(records)
+
+        image_ids = set()
+        for path in changed_paths:
+            match = IMAGE_PATTERN.match(os.path.basename(path))
+            if match and match['id'] in self.recommendations:
+                image_ids.add(match['id'])
+        for artwork_id in image_ids:
+            if self._image_fingerprint(artwork_id) != self.image_fingerprints.get(artwork_id):
+                self._reprobe(artwork_id)
+                reprobed += 1
+
+        if recomputed or reprobed or removed:
+            self._write()
+        return recomputed, reprobed, removed
+
+
+def main():
+    """Build once, then keep both output files current as the catalog and images change"""
+    parser = argparse.ArgumentParser(description="Incrementally rebuild the FinerWorks outputs on change")
+    parser.add_argument("--artworks", default="data/artworks.json")
+    parser.add_argument("--recommendations", default="finerworks_size_recommendations.json")
+    parser.add_argument("--output", default="finerworks_ready_artworks.json")
+    parser.add_argument("--cache", default="image_metadata_cache.jsonl",
+                        help="metadata cache file (default: image_metadata_cache.jsonl)")
+    parser.add_argument("--poll", action="store_true", help="use stat polling even where inotify works")
+    parser.add_argument("--interval", type=float, default=0.5, help="polling interval in seconds")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.artworks):
+        print(f"❌ File not found: {args.artworks}")
+        return
+
+    watcher = ArtworkWatcher(
+        args.artworks, args.recommendations, args.output,
+        extractor=ImageMetadataExtractor(cache=MetadataCache(args.cache), verbose=False),
+        calculator=OptimalSizeCalculator(verbose=False)
+    )
+
+    start = time.perf_counter()
+    count = watcher.build()
+    print(f"✅ Initial build: {count} artworks in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"💾 {args.recommendations}, {args.output}")
+
+    file_watcher = make_watcher(watcher.directories(), poll=args.poll, interval=args.interval)
+    print(f"👀 Watching with {type(file_watcher).__name__} (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = file_watcher.wait()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            recomputed, reprobed, removed = watcher.update(changed)
+            if recomputed or reprobed or removed:
+                print(f"🔄 {recomputed} recomputed, {reprobed} re-probed, {removed} removed "
+                      f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        file_watcher.close()
+
+
+if __name__ == "__main__":
+    main()